@@ -0,0 +1,249 @@
+"""Mesure la latence des reruns de l'application, sans navigateur ni réseau.
+
+Usage :
+    python bench/app_bench.py [--rows 1000 10000 100000] [--repeat 5] [--output bench_results.json]
+
+Pour chaque taille de base :
+- une base synthétique est générée (``bench/gen_dataset.py``) dans une copie
+  temporaire de l'application, pour que ``data/`` (fichiers Arrow, GeoJSON,
+  registre des dons, caches) parte de zéro et reste hors du dépôt ;
+- les services externes sont remplacés par ``bench/mock_upstreams.py`` ;
+- chaque vue est exécutée avec ``streamlit.testing.v1.AppTest`` : page de
+  connexion, carte, recherche, thématiques, don, historique, tableau de bord ;
+- les fonctions critiques sont chronométrées seules : ``load_data``,
+  ``filter_data``, ``create_map`` et ``search_bar``.
+
+Chaque mesure donne le premier passage (``cold_ms``, caches vides) puis la
+médiane et le minimum de ``--repeat`` reruns. Le résultat JSON contient le
+commit courant pour comparer les mesures d'un commit à l'autre.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+USER = "bench@example.org"
+FILTER_CASES = [
+    ("tous", "Tous", [], ""),
+    ("pays", "Niger", [], ""),
+    ("domaine", "Tous", ["Santé"], ""),
+    ("nom", "Tous", [], "medecins"),
+    ("pays_domaine_nom", "Kenya", ["Eau"], "fondation"),
+]
+
+
+def timed(func, repeat):
+    """Premier appel puis médiane / minimum de ``repeat`` appels, en millisecondes"""
+    times = []
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    cold, warm = times[0], times[1:] or times[:1]
+    return {"cold_ms": round(cold, 2), "median_ms": round(statistics.median(warm), 2), "min_ms": round(min(warm), 2)}
+
+
+# ---------------------------
+# MESURES (processus de travail, une taille de base)
+# ---------------------------
+
+def bench_functions(repeat):
+    import dataset
+    import ongapp
+
+    results = [{"name": "load_data", **timed(lambda: ongapp.load_data("bdd_ong.csv"), repeat)}]
+    results.append({"name": "dataset_from_arrow", **timed(lambda: dataset.OngDataset.from_csv("bdd_ong.csv"), repeat)})
+
+    ds = ongapp.load_dataset("bdd_ong.csv")
+    for label, country, domains, name in FILTER_CASES:
+        results.append({
+            "name": f"filter_data[{label}]",
+            **timed(lambda: ongapp.filter_data(ds, country, domains, name), repeat),
+        })
+    results.append({"name": "create_map", **timed(lambda: ongapp.create_map(ds.df), repeat)})
+    return results
+
+
+def bench_search_bar(repeat, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(
+        "import ongapp\nongapp.search_bar(ongapp.load_dataset('bdd_ong.csv'))\n",
+        default_timeout=timeout,
+    )
+    result = {"name": "search_bar", **timed(at.run, repeat)}
+    result["errors"] = [e.value for e in at.exception]
+    return result
+
+
+def _view(name, at, first_run, repeat):
+    """Passage vers la vue (``first_run``) puis ``repeat`` reruns identiques"""
+    times = []
+    start = time.perf_counter()
+    first_run()
+    times.append((time.perf_counter() - start) * 1000)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - start) * 1000)
+    warm = times[1:] or times
+    return {
+        "name": name,
+        "cold_ms": round(times[0], 2),
+        "median_ms": round(statistics.median(warm), 2),
+        "min_ms": round(min(warm), 2),
+        "errors": [e.value for e in at.exception],
+    }
+
+
+def bench_views(repeat, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    script = os.path.join(os.getcwd(), "ongapp.py")
+    results = []
+
+    login = AppTest.from_file(script, default_timeout=timeout)
+    results.append(_view("login", login, login.run, repeat))
+
+    at = AppTest.from_file(script, default_timeout=timeout)
+    at.session_state["user_email"] = USER
+    results.append(_view("map", at, at.run, repeat))
+
+    def search():
+        at.selectbox(key="recherche_pays").select("Niger")
+        next(b for b in at.button if b.label == "Rechercher").click().run()
+
+    results.append(_view("search", at, search, repeat))
+
+    def show(view):
+        return lambda: at.radio(key="vue_active").set_value(view).run()
+
+    results.append(_view("theme", at, show("Par thématique"), repeat))
+    results.append(_view("donation_page", at, show("Faire un don"), repeat))
+
+    # Flux de don complet : chaque passage enregistre un don
+    donations = []
+    for _ in range(repeat + 1):
+        at.number_input[0].set_value(20)
+        start = time.perf_counter()
+        next(b for b in at.button if b.label == "Payer").click().run()
+        donations.append((time.perf_counter() - start) * 1000)
+    results.append({
+        "name": "donation_flow",
+        "cold_ms": round(donations[0], 2),
+        "median_ms": round(statistics.median(donations[1:]), 2),
+        "min_ms": round(min(donations[1:]), 2),
+        "errors": [e.value for e in at.exception],
+    })
+
+    results.append(_view("history", at, show("Mes dons"), repeat))
+    results.append(_view("dashboard", at, show("Tableau de bord"), repeat))
+    return results
+
+
+def run_worker(workdir, repeat, timeout, result_file):
+    """Mesures pour la copie de l'application dans ``workdir`` (processus dédié)"""
+    sys.path.insert(0, BENCH_DIR)
+    import mock_upstreams
+
+    server = mock_upstreams.serve(port=0)
+    os.environ.update(mock_upstreams.environment(server.server_port))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+
+    results = [{"kind": "function", **r} for r in bench_functions(repeat)]
+    results.append({"kind": "function", **bench_search_bar(repeat, timeout)})
+    results.extend({"kind": "view", **r} for r in bench_views(repeat, timeout))
+    server.shutdown()
+
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+# ---------------------------
+# ORCHESTRATION
+# ---------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_app(workdir, rows, seed=0):
+    """Copie l'application dans ``workdir`` et y génère une base de ``rows`` ONG ; rend la durée de génération (s)"""
+    sys.path.insert(0, BENCH_DIR)
+    import gen_dataset
+
+    for path in glob.glob(os.path.join(ROOT_DIR, "*.py")):
+        shutil.copy(path, workdir)
+    start = time.perf_counter()
+    gen_dataset.write_csv(os.path.join(workdir, "bdd_ong.csv"), rows, seed, os.path.join(ROOT_DIR, "bdd_ong.csv"))
+    return time.perf_counter() - start
+
+
+def bench_size(rows, args):
+    """Copie l'application dans un dossier temporaire, y génère la base et lance les mesures"""
+    with tempfile.TemporaryDirectory(prefix="ongapp-bench-") as workdir:
+        generate_s = prepare_app(workdir, rows, args.seed)
+
+        result_file = os.path.join(workdir, "results.json")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", workdir,
+             "--repeat", str(args.repeat), "--timeout", str(args.timeout), "--result-file", result_file],
+            check=True, stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL,
+        )
+        with open(result_file, encoding="utf-8") as f:
+            results = json.load(f)
+    print(f"{rows} ONG : {len(results)} mesures (génération {generate_s:.1f} s)", file=sys.stderr)
+    return [{"rows": rows, **r} for r in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600, help="délai maximal d'un rerun AppTest (s)")
+    parser.add_argument("--output", help="fichier JSON de sortie (sortie standard par défaut)")
+    parser.add_argument("--verbose", action="store_true", help="afficher les journaux Streamlit")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.repeat, args.timeout, args.result_file)
+        return
+
+    report = {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": [r for rows in args.rows for r in bench_size(rows, args)],
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
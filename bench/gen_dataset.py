@@ -0,0 +1,93 @@
+"""Génère des bases d'ONG synthétiques au format de ``bdd_ong.csv`` (1 000 à 500 000 lignes).
+
+Usage :
+    python bench/gen_dataset.py --rows 1000 10000 100000 [--out-dir bench/data] [--seed 0]
+
+Les distributions sont tirées de la base réelle :
+- pays du siège, domaine et coordonnées : une ligne réelle tirée au hasard,
+  coordonnées décalées de quelques dixièmes de degré ;
+- ``pays_intervention`` : longueur de liste tirée parmi les longueurs réelles,
+  pays tirés selon leur fréquence réelle, orthographes françaises et anglaises
+  mélangées comme dans le fichier d'origine ;
+- noms composés de mots courants du secteur, numérotés pour rester distincts ;
+- environ 10 % des ONG sans lien de don.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset  # noqa: E402
+
+NAME_PREFIXES = ["Association", "Fondation", "Comité", "Alliance", "Réseau", "Collectif", "Initiative", "Fonds",
+                 "Action", "Solidarité", "Mission", "Union"]
+NAME_CORES = ["pour l'Enfance", "Santé Sans Frontières", "Eau Vive", "Contre la Faim", "des Droits Humains",
+              "Éducation pour Tous", "Secours Populaire", "Terre d'Avenir", "Médecins Solidaires",
+              "Aide d'Urgence", "Planète Verte", "Femmes et Développement", "Jeunesse du Monde",
+              "Protection Animale", "Habitat Digne", "Agriculture Durable"]
+NAME_PLACES = ["", "", "", "International", "Afrique", "Europe", "Asie", "Monde", "France", "Sahel", "Océan Indien"]
+
+
+def generate(size, seed=0, source="bdd_ong.csv"):
+    """DataFrame de ``size`` ONG synthétiques, colonnes et formats identiques à ``source``"""
+    rng = np.random.default_rng(seed)
+    real = dataset.read_csv(source)
+    real = real[real["latitude"].notna() & real["longitude"].notna()].reset_index(drop=True)
+
+    # Siège, domaine et coordonnées : lignes réelles tirées avec remise
+    picks = rng.integers(0, len(real), size)
+    base = real.iloc[picks].reset_index(drop=True)
+
+    # Listes de pays d'intervention : longueurs et orthographes réelles
+    spellings = real["pays_intervention"].str.split(";").explode().str.strip()
+    spellings = spellings[spellings != ""]
+    counts = spellings.value_counts()
+    lengths = rng.choice(spellings.groupby(level=0).size().to_numpy(), size)
+    drawn = rng.choice(counts.index.to_numpy(dtype=object), lengths.sum(), p=(counts / counts.sum()).to_numpy())
+    bounds = np.cumsum(lengths)[:-1]
+    interventions = [";".join(dict.fromkeys(chunk)) for chunk in np.split(drawn, bounds)]
+
+    names = (
+        pd.Series(rng.choice(NAME_PREFIXES, size)) + " " + rng.choice(NAME_CORES, size) + " "
+        + rng.choice(NAME_PLACES, size) + " " + pd.Series(np.arange(1, size + 1)).astype(str)
+    ).str.split().str.join(" ")
+    slugs = names.str.lower().str.replace(r"[^a-z0-9]+", "-", regex=True).str.strip("-")
+    sites = "https://www." + slugs + ".org"
+    has_link = rng.random(size) >= 0.1
+
+    return pd.DataFrame({
+        "nom": names,
+        "pays": base["pays"].astype(str),
+        "domaine": base["domaine"].astype(str),
+        "latitude": (base["latitude"].astype(float) + rng.normal(0, 0.3, size)).round(4),
+        "longitude": (base["longitude"].astype(float) + rng.normal(0, 0.3, size)).round(4),
+        "site_web": sites,
+        "lien_don": np.where(has_link, sites + "/faire-un-don", ""),
+        "pays_intervention": interventions,
+    })
+
+
+def write_csv(path, size, seed=0, source="bdd_ong.csv"):
+    """Écrit une base synthétique de ``size`` lignes dans ``path`` (séparateur ``;``)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    generate(size, seed, source).to_csv(path, sep=";", index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--out-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default="bdd_ong.csv")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        path = write_csv(os.path.join(args.out_dir, f"bdd_ong_{rows}.csv"), rows, args.seed, args.source)
+        print(f"{rows} ONG -> {path}")
@@ -0,0 +1,336 @@
+"""Test de charge : N sessions simultanées sur un serveur Streamlit local.
+
+Usage :
+    python bench/load_test.py [--sessions 1 5 10 20] [--rows 10000] [--iterations 3] [--output load.json]
+
+Pour chaque nombre de sessions :
+- l'application est copiée dans un dossier temporaire avec une base synthétique
+  (comme ``bench/app_bench.py``) et les services externes sont remplacés par
+  ``bench/mock_upstreams.py`` ;
+- un serveur ``streamlit run`` est démarré, puis une session de chauffe remplit
+  les caches partagés du processus ;
+- N clients se connectent au websocket du serveur et parlent le même protocole
+  que le navigateur (``BackMsg`` / ``ForwardMsg``) : connexion par e-mail, puis
+  ``--iterations`` fois le parcours carte -> recherche -> page suivante ->
+  retour à la carte -> page de don -> paiement -> historique.
+
+Chaque rerun est chronométré de l'envoi de l'interaction à la fin du script.
+Le rapport donne par étape et au total les latences p50 / p99, le volume reçu
+par rerun, et la mémoire résidente (RSS) du serveur avant et avec les N
+sessions ouvertes, d'où la mémoire par session.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import app_bench  # noqa: E402
+import mock_upstreams  # noqa: E402
+
+SEARCH_COUNTRIES = ["Niger", "Kenya", "Mali", "Inde", "Haïti", "Liban"]
+# Fin de rerun : tout sauf FINISHED_EARLY_FOR_RERUN (un autre rerun suit, ex. ``st.rerun()``)
+DONE = {
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+}
+
+
+# ---------------------------
+# CLIENT (protocole du navigateur)
+# ---------------------------
+
+class Session:
+    """Une session de navigateur simulée : état des widgets affichés, reruns chronométrés"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.elements = []  # (type, proto) des éléments du dernier rerun
+        self.states = {}  # id du widget -> WidgetState envoyé au prochain rerun
+        self.errors = []
+
+    async def rerun(self, triggers=()):
+        """Envoie l'état des widgets (+ déclencheurs ponctuels) ; rend ``(ms, octets reçus)``"""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+
+        elements, received = [], 0
+        while True:
+            data = await self.ws.recv()
+            received += len(data)
+            fm = ForwardMsg()
+            fm.ParseFromString(data)
+            kind = fm.WhichOneof("type")
+            if kind == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                element = fm.delta.new_element
+                element_type = element.WhichOneof("type")
+                elements.append((element_type, getattr(element, element_type)))
+                if element_type == "exception":
+                    self.errors.append(element.exception.message)
+            elif kind == "script_finished":
+                if fm.script_finished in DONE:
+                    break
+                elements = []  # rerun demandé par l'application : seul le dernier compte
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.elements = elements
+        # Comme le navigateur : seuls les widgets encore affichés gardent un état
+        shown = {getattr(proto, "id", None) for _, proto in elements}
+        self.states = {wid: state for wid, state in self.states.items() if wid in shown}
+        return elapsed_ms, received
+
+    def find(self, element_type, label=None, key=None):
+        for kind, proto in self.elements:
+            if kind != element_type:
+                continue
+            if key is not None and proto.id.endswith(f"-{key}"):
+                return proto
+            if label is not None and proto.label == label:
+                return proto
+        return None
+
+    def set_value(self, element_type, value, label=None, key=None):
+        """Nouvelle valeur d'un widget (chaîne, nombre ou liste), envoyée aux prochains reruns"""
+        proto = self.find(element_type, label, key)
+        if proto is None:
+            return False
+        state = WidgetState(id=proto.id)
+        if isinstance(value, list):
+            state.string_array_value.data[:] = value
+        elif isinstance(value, (int, float)):
+            state.double_value = value
+        else:
+            state.string_value = value
+        self.states[proto.id] = state
+        return True
+
+    def option(self, element_type, prefix, label=None, key=None):
+        """Option affichée commençant par ``prefix`` (les libellés incluent des effectifs)"""
+        proto = self.find(element_type, label, key)
+        if proto is None:
+            return None
+        return next((o for o in proto.options if o.startswith(prefix)), None)
+
+    def click(self, label=None, key=None):
+        """Déclencheur d'un bouton, ou ``None`` s'il n'est pas affiché ou désactivé"""
+        proto = self.find("button", label, key)
+        if proto is None or proto.disabled:
+            return None
+        return WidgetState(id=proto.id, trigger_value=True)
+
+
+async def user_flow(port, index, iterations, think, timings, finished, release):
+    """Parcours d'un utilisateur ; ajoute ``(étape, ms, octets)`` à ``timings``.
+
+    Une fois le parcours fini, la connexion reste ouverte jusqu'à ``release``
+    pour que la mémoire des sessions soit mesurée.
+    """
+    rng = random.Random(index)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        session = Session(ws)
+
+        async def step(name, triggers=()):
+            ms, received = await session.rerun([t for t in triggers if t is not None])
+            timings.append((name, ms, received))
+            if think:
+                await asyncio.sleep(rng.uniform(0, think))
+
+        await step("accueil")
+        session.set_value("text_input", f"charge{index}@example.org", label="Adresse e-mail :")
+        await step("connexion", [session.click(label="Se connecter")])
+
+        for _ in range(iterations):
+            session.set_value("radio", "Carte interactive", key="vue_active")
+            await step("carte")
+
+            pays = session.option("selectbox", rng.choice(SEARCH_COUNTRIES), key="recherche_pays")
+            if pays:
+                session.set_value("selectbox", pays, key="recherche_pays")
+            await step("recherche", [session.click(label="Rechercher")])
+            await step("page_suivante", [session.click(key="page_recherche_suiv")])
+            await step("retour_carte", [session.click(label="↩️ Revenir à la carte")])
+
+            session.set_value("radio", "Faire un don", key="vue_active")
+            await step("page_don")
+            session.set_value("number_input", float(rng.randint(5, 100)), label="Montant du don (€)")
+            await step("paiement", [session.click(label="Payer")])
+
+            session.set_value("radio", "Mes dons", key="vue_active")
+            await step("historique")
+
+        finished.append(index)
+        await release.wait()
+        return session.errors
+
+
+# ---------------------------
+# SERVEUR
+# ---------------------------
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid):
+    """Mémoire résidente du processus ``pid`` (Mo)"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    out = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True).stdout
+    return int(out.strip() or 0) / 1024
+
+
+def start_server(workdir, env, verbose):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "ongapp.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=workdir, env=env,
+        stdout=None if verbose else subprocess.DEVNULL, stderr=None if verbose else subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Le serveur Streamlit n'a pas démarré")
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(timings):
+    ms = [t[1] for t in timings]
+    return {
+        "reruns": len(ms),
+        "p50_ms": round(statistics.median(ms), 1),
+        "p99_ms": round(percentile(ms, 0.99), 1),
+        "max_ms": round(max(ms), 1),
+        "median_kb": round(statistics.median(t[2] for t in timings) / 1024, 1),
+    }
+
+
+async def run_sessions(port, n, iterations, think, pid):
+    """Lance les N parcours ; le RSS est mesuré quand tous sont finis, sessions encore ouvertes"""
+    timings, finished = [], []
+    release = asyncio.Event()
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(user_flow(port, i, iterations, think, timings, finished, release))
+        for i in range(n)
+    ]
+    while len(finished) < n and not any(t.done() for t in tasks):
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    rss = rss_mb(pid)
+    release.set()
+    errors = await asyncio.gather(*tasks)
+    return timings, elapsed, rss, [e for errs in errors for e in errs]
+
+
+def load_level(workdir, env, n, args):
+    """Nouveau serveur, session de chauffe, puis N sessions simultanées"""
+    process, port = start_server(workdir, env, args.verbose)
+    try:
+        asyncio.run(run_sessions(port, 1, 1, 0, process.pid))
+        time.sleep(0.5)
+        rss_base = rss_mb(process.pid)
+        timings, elapsed, rss_loaded, errors = asyncio.run(run_sessions(port, n, args.iterations, args.think, process.pid))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    steps = {}
+    for name, ms, received in timings:
+        steps.setdefault(name, []).append((name, ms, received))
+    result = {
+        "sessions": n,
+        **summarize(timings),
+        "reruns_per_s": round(len(timings) / elapsed, 2),
+        "rss_base_mb": round(rss_base, 1),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_per_session_mb": round((rss_loaded - rss_base) / n, 2),
+        "steps": {name: summarize(values) for name, values in steps.items()},
+        "errors": sorted(set(errors)),
+    }
+    print(
+        f"{n} sessions : p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+        f"{result['rss_per_session_mb']} Mo / session", file=sys.stderr,
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=3, help="parcours complets par session")
+    parser.add_argument("--think", type=float, default=0.0, help="pause maximale entre deux actions (s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="latence des services simulés (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="fichier JSON de sortie (sortie standard par défaut)")
+    parser.add_argument("--verbose", action="store_true", help="afficher les journaux Streamlit")
+    args = parser.parse_args()
+
+    upstreams = mock_upstreams.serve(port=0, latency=args.latency)
+    env = {**os.environ, **mock_upstreams.environment(upstreams.server_port)}
+    with tempfile.TemporaryDirectory(prefix="ongapp-load-") as workdir:
+        app_bench.prepare_app(workdir, args.rows, args.seed)
+        results = [load_level(workdir, env, n, args) for n in args.sessions]
+    upstreams.shutdown()
+
+    report = {
+        "commit": app_bench.git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rows": args.rows,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
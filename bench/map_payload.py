@@ -0,0 +1,116 @@
+"""Compare la taille et le temps de construction de la carte IDH selon le mode de rendu.
+
+Usage :
+    python bench/map_payload.py [--geojson chemin/world-countries.json] [--repeat 3] [--levels]
+
+Pour chaque mode (une couche par pays / une seule couche), on mesure :
+- le temps de construction + rendu Folium côté Python ;
+- le temps de génération du script Leaflet envoyé par st_folium ;
+- la taille (brute et gzip) du HTML complet et du script Leaflet ;
+- le nombre de couches ``L.geoJson`` créées dans le navigateur.
+
+Avec ``--levels``, on mesure aussi la carte en une seule couche pour chaque
+niveau de détail de la géométrie (octets transférés par niveau).
+
+Avec ``--markers``, on mesure la couche des sièges d'ONG pour une base
+répliquée jusqu'à 1 000, 10 000 et 100 000 ONG : un point par ONG ou un point
+par cellule de grille (``map_assets.hq_cells``).
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import folium  # noqa: E402
+from streamlit_folium import generate_leaflet_string  # noqa: E402
+
+import dataset  # noqa: E402
+import map_assets  # noqa: E402
+
+
+def measure(styled, single_layer, repeat, label=None):
+    """Mesures (meilleur temps sur ``repeat`` essais) pour un mode de rendu"""
+    build_times, script_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        m = map_assets.build_idh_map(styled, single_layer=single_layer)
+        build_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        script = generate_leaflet_string(m)
+        script_times.append(time.perf_counter() - start)
+
+    html = m.get_root().render().encode("utf-8")
+    script = script.encode("utf-8")
+    return {
+        "mode": label or ("single_layer" if single_layer else "per_country"),
+        "build_ms": round(min(build_times) * 1000, 1),
+        "script_ms": round(min(script_times) * 1000, 1),
+        "html_bytes": len(html),
+        "html_gzip_bytes": len(gzip.compress(html)),
+        "script_bytes": len(script),
+        "script_gzip_bytes": len(gzip.compress(script)),
+        "geojson_layers": script.count(b"L.geoJson("),
+    }
+
+
+def measure_markers(df, sizes=(1_000, 10_000, 100_000)):
+    """Taille du script de la couche des sièges, sans et avec regroupement par cellule"""
+    results = []
+    for size in (len(df), *sizes):
+        sample = df if size == len(df) else df.sample(size, replace=size > len(df), random_state=0)
+        per_ngo = [[lat, lon, 1, nom] for lat, lon, nom in sample[["latitude", "longitude", "nom"]].dropna().itertuples(index=False)]
+        for mode, cells in (("markers_per_ngo", per_ngo), ("markers_grid", map_assets.hq_cells(sample))):
+            layer = map_assets.build_hq_layer(cells)
+            layer.add_to(folium.Map())
+            script = generate_leaflet_string(layer).encode("utf-8")
+            results.append({
+                "mode": mode,
+                "ngos": size,
+                "points": len(cells),
+                "script_bytes": len(script),
+                "script_gzip_bytes": len(gzip.compress(script)),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--geojson", default=map_assets.GEOJSON_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--levels", action="store_true", help="mesurer chaque niveau de détail")
+    parser.add_argument("--markers", action="store_true", help="mesurer la couche des sièges d'ONG")
+    parser.add_argument("--csv", default="bdd_ong.csv")
+    args = parser.parse_args()
+
+    styled = map_assets.styled_geojson(map_assets.load_world_geojson(args.geojson))
+    results = [measure(styled, single_layer, args.repeat) for single_layer in (False, True)]
+
+    before, after = results
+    results.append({
+        "mode": "ratio",
+        **{
+            key: round(after[key] / before[key], 3)
+            for key in before
+            if key != "mode" and before[key]
+        },
+    })
+
+    if args.levels:
+        for level, _, _, _ in map_assets.GEOMETRY_LEVELS:
+            styled_level = map_assets.styled_geojson(map_assets.load_geojson_level(level, args.geojson))
+            results.append(measure(styled_level, True, args.repeat, label=f"level_{level}"))
+
+    if args.markers:
+        results.extend(measure_markers(dataset.read_csv(args.csv)))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
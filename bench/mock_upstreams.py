@@ -0,0 +1,165 @@
+"""Serveur local imitant les services externes de l'application (tests hors ligne).
+
+Usage :
+    python bench/mock_upstreams.py [--port 8765] [--latency 0.05] [--fail-rate 0.1]
+
+Puis lancer l'application avec :
+    ONGAPP_GEOJSON_URL=http://127.0.0.1:8765/world-countries.json
+    ONGAPP_RESTCOUNTRIES_URL=http://127.0.0.1:8765
+    ONGAPP_RELIEFWEB_URL=http://127.0.0.1:8765/v1/reports
+
+Routes servies :
+- ``/world-countries.json`` : GeoJSON synthétique (un polygone par pays connu) ;
+- ``/v3.1/all`` et ``/v3.1/alpha/<ISO3>`` : réponses au format RestCountries ;
+- ``/v1/reports`` : rapports au format ReliefWeb.
+
+``--latency`` ajoute un délai à chaque réponse et ``--fail-rate`` renvoie une
+erreur (503, ou ``--fail-status``) sur une fraction des requêtes, pour exercer
+délais, nouvelles tentatives et disjoncteur du client HTTP.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import countries  # noqa: E402
+
+
+def synthetic_world(vertices=60):
+    """Un polygone circulaire par pays de la table, disposés en grille"""
+    features = []
+    for i, (iso3, _, name_en, _) in enumerate(countries.COUNTRIES):
+        cx, cy = (i % 30) * 12 - 174, (i // 30) * 22 - 66
+        ring = [
+            [round(cx + 5 * math.cos(2 * math.pi * k / vertices), 4),
+             round(cy + 4 * math.sin(2 * math.pi * k / vertices), 4)]
+            for k in range(vertices)
+        ]
+        ring.append(ring[0])
+        features.append({
+            "type": "Feature", "id": iso3, "properties": {"name": name_en},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def restcountries_entry(iso3, name_en):
+    rng = random.Random(iso3)
+    return {
+        "cca3": iso3,
+        "name": {"common": name_en},
+        "capital": [f"Capitale {name_en}"],
+        "population": rng.randint(100_000, 200_000_000),
+        "languages": {"eng": "English"},
+        "flags": {"png": f"https://flagcdn.example/{iso3.lower()}.png"},
+    }
+
+
+def reliefweb_reports(limit, offset=0):
+    return {"data": [
+        {"fields": {
+            "title": f"Rapport humanitaire n°{offset + i + 1}",
+            "date": {"created": "2026-01-01T00:00:00+00:00"},
+            "source": [{"name": "OCHA"}],
+            "body-html": "<p>" + "Situation humanitaire. " * 60 + "</p>",
+            "url": f"https://reliefweb.example/report/{offset + i + 1}",
+        }}
+        for i in range(limit)
+    ]}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    fail_rate = 0.0
+    fail_status = 503
+    world = None
+    country_entries = {iso3: restcountries_entry(iso3, en) for iso3, _, en, _ in countries.COUNTRIES}
+    hits = {}
+    _lock = threading.Lock()
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client parti avant la réponse (délai d'attente dépassé)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        with self._lock:
+            self.hits[parts.path] = self.hits.get(parts.path, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            return self._send_json(self.fail_status, {"error": "indisponible"})
+
+        if parts.path == "/world-countries.json":
+            return self._send_json(200, self.world)
+        if parts.path == "/v3.1/all":
+            return self._send_json(200, list(self.country_entries.values()))
+        if parts.path.startswith("/v3.1/alpha/"):
+            entry = self.country_entries.get(parts.path.rsplit("/", 1)[-1].upper())
+            return self._send_json(200, [entry]) if entry else self._send_json(404, {"message": "Not Found"})
+        if parts.path == "/v1/reports":
+            limit = int(query.get("limit", ["10"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            return self._send_json(200, reliefweb_reports(limit, offset))
+        if parts.path == "/hits":
+            return self._send_json(200, self.hits)
+        return self._send_json(404, {"error": "route inconnue"})
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port=8765, latency=0.0, fail_rate=0.0, fail_status=503):
+    """Démarre le serveur dans un thread ; retourne l'objet serveur (``shutdown()`` pour l'arrêter)"""
+    MockHandler.latency = latency
+    MockHandler.fail_rate = fail_rate
+    MockHandler.fail_status = fail_status
+    MockHandler.world = synthetic_world()
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def environment(port=8765):
+    """Variables d'environnement pointant l'application vers ce serveur"""
+    base = f"http://127.0.0.1:{port}"
+    return {
+        "ONGAPP_GEOJSON_URL": f"{base}/world-countries.json",
+        "ONGAPP_RESTCOUNTRIES_URL": base,
+        "ONGAPP_RELIEFWEB_URL": f"{base}/v1/reports",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faux services externes pour tester l'application hors ligne")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="délai ajouté à chaque réponse (s)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction des requêtes en erreur")
+    parser.add_argument("--fail-status", type=int, default=503, help="code HTTP des requêtes en erreur (503, 429...)")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.latency, args.fail_rate, args.fail_status)
+    for key, value in environment(args.port).items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,78 @@
+"""Compare la recherche par nom (index trigrammes) au filtre ``str.contains`` d'origine.
+
+Usage :
+    python bench/name_search.py [--size 100000] [--repeat 200] [--csv bdd_ong.csv]
+
+Les noms sont générés à partir du vocabulaire de la base réelle (mots courants)
+et de pseudo-mots, pour atteindre ``--size`` ONG. Pour chaque requête, on
+mesure le temps médian de ``NameIndex.search`` (20 premiers résultats) et de
+``str.contains`` sur la même colonne.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+import name_search  # noqa: E402
+
+QUERIES = ["medecins", "Médecins", "medcins sans", "croix rouge", "save chil", "a", "international", "zzzz"]
+SYLLABLES = ["ba", "ko", "mi", "ra", "te", "lu", "sa", "no", "vi", "de", "po", "ga", "ri", "fe", "tu", "zo"]
+
+
+def synthetic_names(real_names, size, seed=1):
+    """``size`` noms mêlant mots de la base réelle (30 %) et pseudo-mots"""
+    rng = random.Random(seed)
+    vocabulary = sorted({w for name in real_names for w in str(name).split()})
+
+    def word():
+        if rng.random() < 0.3:
+            return rng.choice(vocabulary)
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+    return [" ".join(word() for _ in range(rng.randint(2, 5))) for _ in range(size)]
+
+
+def median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(statistics.median(times) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default="bdd_ong.csv")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    names = synthetic_names(pd.read_csv(args.csv, sep=";")["nom"].dropna(), args.size)
+    column = pd.Series(names)
+    start = time.perf_counter()
+    index = name_search.NameIndex(names)
+    results = [{"query": None, "build_s": round(time.perf_counter() - start, 2), "size": args.size}]
+
+    for query in QUERIES:
+        results.append({
+            "query": query,
+            "index_ms": median_ms(lambda: index.search(query, 20), args.repeat),
+            "contains_ms": median_ms(lambda: column.str.contains(query, case=False, regex=False), max(args.repeat // 20, 3)),
+            "index_hits": len(index.search(query)),
+            "contains_hits": int(column.str.contains(query, case=False, regex=False).sum()),
+        })
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Résolution des noms de pays vers leur code ISO3.
+
+Les noms de pays arrivent sous plusieurs orthographes : le CSV des ONG mélange
+français et anglais, la table IDH suit la nomenclature ONU et le GeoJSON a ses
+propres libellés. Toutes ces variantes sont ramenées à un code ISO3 par une
+table d'alias précalculée (recherche en O(1)), avec un repli insensible aux
+accents, à la casse et à la ponctuation.
+
+Lancer ``python countries.py`` affiche les noms que la table ne sait pas résoudre.
+"""
+
+import re
+import unicodedata
+
+# (ISO3, nom français, nom anglais, autres alias)
+COUNTRIES = [
+    ("AFG", "Afghanistan", "Afghanistan", []),
+    ("ZAF", "Afrique du Sud", "South Africa", []),
+    ("ALB", "Albanie", "Albania", []),
+    ("DZA", "Algérie", "Algeria", []),
+    ("DEU", "Allemagne", "Germany", []),
+    ("AND", "Andorre", "Andorra", []),
+    ("AGO", "Angola", "Angola", []),
+    ("ATA", "Antarctique", "Antarctica", []),
+    ("ATG", "Antigua-et-Barbuda", "Antigua and Barbuda", []),
+    ("SAU", "Arabie saoudite", "Saudi Arabia", []),
+    ("ARG", "Argentine", "Argentina", []),
+    ("ARM", "Arménie", "Armenia", []),
+    ("AUS", "Australie", "Australia", []),
+    ("AUT", "Autriche", "Austria", []),
+    ("AZE", "Azerbaïdjan", "Azerbaijan", []),
+    ("BHS", "Bahamas", "Bahamas", ["The Bahamas"]),
+    ("BHR", "Bahreïn", "Bahrain", []),
+    ("BGD", "Bangladesh", "Bangladesh", []),
+    ("BRB", "Barbade", "Barbados", []),
+    ("BEL", "Belgique", "Belgium", []),
+    ("BLZ", "Belize", "Belize", []),
+    ("BEN", "Bénin", "Benin", []),
+    ("BTN", "Bhoutan", "Bhutan", []),
+    ("BLR", "Biélorussie", "Belarus", ["Bélarus"]),
+    ("BOL", "Bolivie", "Bolivia", ["Bolivia (Plurinational State of)"]),
+    ("BIH", "Bosnie-Herzégovine", "Bosnia and Herzegovina", ["Bosnia", "Bosnia-Herzegovina"]),
+    ("BWA", "Botswana", "Botswana", []),
+    ("BRA", "Brésil", "Brazil", []),
+    ("BRN", "Brunei", "Brunei", ["Brunei Darussalam"]),
+    ("BGR", "Bulgarie", "Bulgaria", []),
+    ("BFA", "Burkina Faso", "Burkina Faso", []),
+    ("BDI", "Burundi", "Burundi", []),
+    ("KHM", "Cambodge", "Cambodia", []),
+    ("CMR", "Cameroun", "Cameroon", []),
+    ("CAN", "Canada", "Canada", []),
+    ("CPV", "Cap-Vert", "Cabo Verde", ["Cape Verde"]),
+    ("CHL", "Chili", "Chile", []),
+    ("CHN", "Chine", "China", []),
+    ("CYP", "Chypre", "Cyprus", ["Northern Cyprus"]),
+    ("COL", "Colombie", "Colombia", []),
+    ("COM", "Comores", "Comoros", []),
+    ("PRK", "Corée du Nord", "North Korea", ["Democratic People's Republic of Korea"]),
+    ("KOR", "Corée du Sud", "South Korea", ["Republic of Korea", "Korea, Republic of"]),
+    ("CRI", "Costa Rica", "Costa Rica", []),
+    ("CIV", "Côte d'Ivoire", "Ivory Coast", []),
+    ("HRV", "Croatie", "Croatia", []),
+    ("CUB", "Cuba", "Cuba", []),
+    ("DNK", "Danemark", "Denmark", []),
+    ("DJI", "Djibouti", "Djibouti", []),
+    ("DMA", "Dominique", "Dominica", []),
+    ("EGY", "Égypte", "Egypt", []),
+    ("ARE", "Émirats arabes unis", "United Arab Emirates", ["UAE"]),
+    ("ECU", "Équateur", "Ecuador", []),
+    ("ERI", "Érythrée", "Eritrea", []),
+    ("ESP", "Espagne", "Spain", []),
+    ("EST", "Estonie", "Estonia", []),
+    ("SWZ", "Eswatini", "Eswatini", ["Swaziland", "Eswatini (Kingdom of)"]),
+    ("USA", "États-Unis", "United States of America", ["United States", "USA", "US"]),
+    ("ETH", "Éthiopie", "Ethiopia", []),
+    ("FJI", "Fidji", "Fiji", []),
+    ("FIN", "Finlande", "Finland", []),
+    ("FRA", "France", "France", []),
+    ("GAB", "Gabon", "Gabon", []),
+    ("GMB", "Gambie", "Gambia", ["The Gambia"]),
+    ("GEO", "Géorgie", "Georgia", []),
+    ("GHA", "Ghana", "Ghana", []),
+    ("GRC", "Grèce", "Greece", []),
+    ("GRD", "Grenade", "Grenada", []),
+    ("GRL", "Groenland", "Greenland", []),
+    ("GTM", "Guatemala", "Guatemala", []),
+    ("GIN", "Guinée", "Guinea", []),
+    ("GNQ", "Guinée équatoriale", "Equatorial Guinea", []),
+    ("GNB", "Guinée-Bissau", "Guinea-Bissau", ["Guinea Bissau"]),
+    ("GUY", "Guyana", "Guyana", []),
+    ("GUF", "Guyane", "French Guiana", []),
+    ("HTI", "Haïti", "Haiti", []),
+    ("HND", "Honduras", "Honduras", []),
+    ("HKG", "Hong Kong", "Hong Kong", ["Hong Kong, China (SAR)"]),
+    ("HUN", "Hongrie", "Hungary", []),
+    ("FLK", "Îles Malouines", "Falkland Islands", []),
+    ("MHL", "Îles Marshall", "Marshall Islands", []),
+    ("SLB", "Îles Salomon", "Solomon Islands", []),
+    ("IND", "Inde", "India", []),
+    ("IDN", "Indonésie", "Indonesia", []),
+    ("IRQ", "Irak", "Iraq", []),
+    ("IRN", "Iran", "Iran", ["Iran (Islamic Republic of)"]),
+    ("IRL", "Irlande", "Ireland", []),
+    ("ISL", "Islande", "Iceland", []),
+    ("ISR", "Israël", "Israel", []),
+    ("ITA", "Italie", "Italy", []),
+    ("JAM", "Jamaïque", "Jamaica", []),
+    ("JPN", "Japon", "Japan", []),
+    ("JOR", "Jordanie", "Jordan", []),
+    ("KAZ", "Kazakhstan", "Kazakhstan", []),
+    ("KEN", "Kenya", "Kenya", []),
+    ("KGZ", "Kirghizistan", "Kyrgyzstan", []),
+    ("KIR", "Kiribati", "Kiribati", []),
+    ("XKX", "Kosovo", "Kosovo", []),
+    ("KWT", "Koweït", "Kuwait", []),
+    ("LAO", "Laos", "Laos", ["Lao", "Lao PDR", "Lao People's Democratic Republic"]),
+    ("LSO", "Lesotho", "Lesotho", []),
+    ("LVA", "Lettonie", "Latvia", []),
+    ("LBN", "Liban", "Lebanon", []),
+    ("LBR", "Liberia", "Liberia", []),
+    ("LBY", "Libye", "Libya", []),
+    ("LIE", "Liechtenstein", "Liechtenstein", []),
+    ("LTU", "Lituanie", "Lithuania", []),
+    ("LUX", "Luxembourg", "Luxembourg", ["Luxemburg"]),
+    ("MKD", "Macédoine du Nord", "North Macedonia", ["Macedonia"]),
+    ("MDG", "Madagascar", "Madagascar", []),
+    ("MYS", "Malaisie", "Malaysia", []),
+    ("MWI", "Malawi", "Malawi", []),
+    ("MDV", "Maldives", "Maldives", []),
+    ("MLI", "Mali", "Mali", []),
+    ("MLT", "Malte", "Malta", []),
+    ("MAR", "Maroc", "Morocco", []),
+    ("MUS", "Maurice", "Mauritius", ["Île Maurice"]),
+    ("MRT", "Mauritanie", "Mauritania", []),
+    ("MEX", "Mexique", "Mexico", []),
+    ("FSM", "Micronésie", "Micronesia", ["Micronesia (Federated States of)"]),
+    ("MDA", "Moldavie", "Moldova", ["Republic of Moldova"]),
+    ("MCO", "Monaco", "Monaco", []),
+    ("MNG", "Mongolie", "Mongolia", []),
+    ("MNE", "Monténégro", "Montenegro", []),
+    ("MOZ", "Mozambique", "Mozambique", []),
+    ("MMR", "Myanmar", "Myanmar", ["Burma", "Birmanie"]),
+    ("NAM", "Namibie", "Namibia", []),
+    ("NRU", "Nauru", "Nauru", []),
+    ("NPL", "Népal", "Nepal", []),
+    ("NIC", "Nicaragua", "Nicaragua", []),
+    ("NER", "Niger", "Niger", []),
+    ("NGA", "Nigeria", "Nigeria", []),
+    ("NOR", "Norvège", "Norway", []),
+    ("NCL", "Nouvelle-Calédonie", "New Caledonia", []),
+    ("NZL", "Nouvelle-Zélande", "New Zealand", []),
+    ("OMN", "Oman", "Oman", []),
+    ("UGA", "Ouganda", "Uganda", []),
+    ("UZB", "Ouzbékistan", "Uzbekistan", []),
+    ("PAK", "Pakistan", "Pakistan", []),
+    ("PLW", "Palaos", "Palau", []),
+    ("PSE", "Palestine", "Palestine", [
+        "Palestine, State of", "Palestinian Territories", "Occupied Palestinian Territories",
+        "Territoires palestiniens", "West Bank", "Cisjordanie", "Gaza", "Gaza Strip",
+    ]),
+    ("PAN", "Panama", "Panama", []),
+    ("PNG", "Papouasie-Nouvelle-Guinée", "Papua New Guinea", ["Papua Guinea"]),
+    ("PRY", "Paraguay", "Paraguay", []),
+    ("NLD", "Pays-Bas", "Netherlands", []),
+    ("PER", "Pérou", "Peru", []),
+    ("PHL", "Philippines", "Philippines", []),
+    ("POL", "Pologne", "Poland", []),
+    ("PRI", "Porto Rico", "Puerto Rico", []),
+    ("PRT", "Portugal", "Portugal", []),
+    ("QAT", "Qatar", "Qatar", []),
+    ("CAF", "République centrafricaine", "Central African Republic", ["Centrafrique"]),
+    ("COD", "République démocratique du Congo", "Democratic Republic of the Congo", [
+        "Democratic Republic of Congo", "Congo (Democratic Republic of the)", "DR Congo",
+        "DRC", "RDC", "Congo-Kinshasa",
+    ]),
+    ("COG", "République du Congo", "Republic of the Congo", ["Congo", "Republic of Congo", "Congo-Brazzaville"]),
+    ("DOM", "République dominicaine", "Dominican Republic", []),
+    ("ROU", "Roumanie", "Romania", []),
+    ("GBR", "Royaume-Uni", "United Kingdom", [
+        "UK", "Great Britain", "England", "Scotland", "Wales", "Northern Ireland",
+    ]),
+    ("RUS", "Russie", "Russia", ["Russian Federation"]),
+    ("RWA", "Rwanda", "Rwanda", []),
+    ("ESH", "Sahara occidental", "Western Sahara", []),
+    ("KNA", "Saint-Christophe-et-Niévès", "Saint Kitts and Nevis", []),
+    ("SMR", "Saint-Marin", "San Marino", []),
+    ("VCT", "Saint-Vincent-et-les-Grenadines", "Saint Vincent and the Grenadines", []),
+    ("LCA", "Sainte-Lucie", "Saint Lucia", []),
+    ("SLV", "Salvador", "El Salvador", []),
+    ("WSM", "Samoa", "Samoa", []),
+    ("STP", "Sao Tomé-et-Principe", "Sao Tome and Principe", []),
+    ("SEN", "Sénégal", "Senegal", []),
+    ("SRB", "Serbie", "Serbia", ["Republic of Serbia"]),
+    ("SYC", "Seychelles", "Seychelles", []),
+    ("SLE", "Sierra Leone", "Sierra Leone", []),
+    ("SGP", "Singapour", "Singapore", []),
+    ("SVK", "Slovaquie", "Slovakia", []),
+    ("SVN", "Slovénie", "Slovenia", []),
+    ("SOM", "Somalie", "Somalia", ["Somaliland"]),
+    ("SDN", "Soudan", "Sudan", []),
+    ("SSD", "Soudan du Sud", "South Sudan", []),
+    ("LKA", "Sri Lanka", "Sri Lanka", []),
+    ("SWE", "Suède", "Sweden", []),
+    ("CHE", "Suisse", "Switzerland", []),
+    ("SUR", "Suriname", "Suriname", []),
+    ("SYR", "Syrie", "Syria", ["Syrian Arab Republic"]),
+    ("TJK", "Tadjikistan", "Tajikistan", []),
+    ("TWN", "Taïwan", "Taiwan", []),
+    ("TZA", "Tanzanie", "Tanzania", ["United Republic of Tanzania", "Tanzania (United Republic of)"]),
+    ("TCD", "Tchad", "Chad", []),
+    ("CZE", "Tchéquie", "Czechia", ["Czech Republic", "République tchèque"]),
+    ("ATF", "Terres australes françaises", "French Southern and Antarctic Lands", []),
+    ("THA", "Thaïlande", "Thailand", []),
+    ("TLS", "Timor oriental", "Timor-Leste", ["East Timor"]),
+    ("TGO", "Togo", "Togo", []),
+    ("TON", "Tonga", "Tonga", []),
+    ("TTO", "Trinité-et-Tobago", "Trinidad and Tobago", ["Trinidad"]),
+    ("TUN", "Tunisie", "Tunisia", []),
+    ("TKM", "Turkménistan", "Turkmenistan", []),
+    ("TUR", "Turquie", "Türkiye", ["Turkey"]),
+    ("TUV", "Tuvalu", "Tuvalu", []),
+    ("UKR", "Ukraine", "Ukraine", []),
+    ("URY", "Uruguay", "Uruguay", []),
+    ("VUT", "Vanuatu", "Vanuatu", []),
+    ("VAT", "Vatican", "Holy See", ["Vatican City"]),
+    ("VEN", "Venezuela", "Venezuela", ["Venezuela (Bolivarian Republic of)"]),
+    ("VNM", "Viêt Nam", "Vietnam", []),
+    ("YEM", "Yémen", "Yemen", []),
+    ("ZMB", "Zambie", "Zambia", []),
+    ("ZWE", "Zimbabwe", "Zimbabwe", []),
+]
+
+_ARTICLES = {"the", "le", "la", "les", "l"}
+
+
+def exact_key(name):
+    """Clé de recherche exacte : casse, espaces et apostrophes unifiés"""
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFC", name).replace("’", "'").replace("`", "'")
+    return " ".join(name.split()).casefold()
+
+
+def loose_key(name):
+    """Clé de repli : sans accents, sans ponctuation ni articles"""
+    name = unicodedata.normalize("NFKD", exact_key(name))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    words = re.sub(r"[^a-z0-9]+", " ", name).split()
+    return " ".join(w for w in words if w not in _ARTICLES)
+
+
+class CountryResolver:
+    """Table d'alias -> ISO3 construite une fois ; ``resolve`` est une recherche de dictionnaire"""
+
+    def __init__(self, countries=COUNTRIES):
+        self.names_fr = {}
+        self.names_en = {}
+        self._exact = {}
+        self._loose = {}
+        for iso3, name_fr, name_en, aliases in countries:
+            self.names_fr[iso3] = name_fr
+            self.names_en[iso3] = name_en
+            for alias in [iso3, name_fr, name_en, *aliases]:
+                self._add(self._exact, exact_key(alias), iso3)
+                self._add(self._loose, loose_key(alias), iso3)
+        # Mémo des noms bruts déjà résolus (les mêmes chaînes reviennent sans cesse)
+        self._memo = {}
+
+    @staticmethod
+    def _add(table, key, iso3):
+        previous = table.setdefault(key, iso3)
+        if previous != iso3:
+            raise ValueError(f"Alias ambigu {key!r} : {previous} / {iso3}")
+
+    def resolve(self, name):
+        """Code ISO3 d'un nom de pays, ou None s'il est inconnu"""
+        try:
+            return self._memo[name]
+        except (KeyError, TypeError):
+            pass
+        key = exact_key(name)
+        iso3 = (self._exact.get(key) or self._loose.get(loose_key(name))) if key else None
+        if isinstance(name, str):
+            self._memo[name] = iso3
+        return iso3
+
+    def name(self, iso3, lang="fr"):
+        """Nom d'affichage d'un code ISO3"""
+        names = self.names_fr if lang == "fr" else self.names_en
+        return names.get(iso3, iso3)
+
+    def unresolved(self, names):
+        """Noms (dédoublonnés, triés) que la table ne sait pas résoudre"""
+        return sorted({n for n in names if isinstance(n, str) and n.strip() and self.resolve(n) is None})
+
+
+_default_resolver = None
+
+
+def get_resolver():
+    """Résolveur partagé par tout le processus (construit au premier appel)"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = CountryResolver()
+    return _default_resolver
+
+
+def resolve(name):
+    return get_resolver().resolve(name)
+
+
+def unresolved_report(csv_path="bdd_ong.csv"):
+    """Noms non résolus par source : CSV des ONG, table IDH et GeoJSON (s'il est présent)"""
+    import os
+
+    import pandas as pd
+
+    import map_assets
+    from dataset import split_countries
+
+    resolver = get_resolver()
+    df = pd.read_csv(csv_path, sep=";")
+    csv_names = list(df["pays"].dropna())
+    for value in df["pays_intervention"]:
+        csv_names.extend(split_countries(value))
+
+    report = {
+        "bdd_ong.csv": resolver.unresolved(csv_names),
+        "IDH": resolver.unresolved(map_assets.IDH_DATA),
+    }
+    if os.path.exists(map_assets.GEOJSON_PATH):
+        features = map_assets.load_world_geojson()["features"]
+        report["GeoJSON"] = sorted(
+            f["properties"].get("name", "?") for f in features
+            if resolver.resolve(f.get("id")) is None and resolver.resolve(f["properties"].get("name")) is None
+        )
+    return report
+
+
+if __name__ == "__main__":
+    for source, names in unresolved_report().items():
+        print(f"{source} : {len(names)} nom(s) non résolu(s)")
+        for name in names:
+            print(f"  - {name}")
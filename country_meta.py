@@ -0,0 +1,150 @@
+"""Métadonnées des pays (capitale, population, langues, drapeau) servies hors ligne.
+
+Les données viennent d'un instantané de l'API RestCountries enregistré dans
+``data/countries_meta.json`` et indexé par code ISO3 : un clic sur la carte
+est une simple lecture de dictionnaire. Les pays absents de l'instantané sont
+demandés en direct : une réponse valide est ajoutée à l'instantané sur disque
+(une installation neuve le complète au fil des clics), un échec est gardé peu de
+temps dans un petit cache LRU pour ne pas réinterroger l'API à chaque clic, et
+un refus du disjoncteur (API déjà en panne) n'est pas mis en cache du tout.
+
+Rafraîchir l'instantané :
+    python country_meta.py --refresh [--base-url http://localhost:8000]
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+import http_client
+from fileutils import DATA_DIR, read_json, write_json_atomic
+
+META_PATH = os.path.join(DATA_DIR, "countries_meta.json")
+RESTCOUNTRIES_URL = os.environ.get("ONGAPP_RESTCOUNTRIES_URL", "https://restcountries.com")
+FIELDS = "cca3,capital,population,languages,flags"
+
+
+def parse_country(entry):
+    """Ne garde que les champs affichés dans le panneau latéral"""
+    return {
+        "capital": list(entry.get("capital") or []),
+        "population": entry.get("population"),
+        "languages": sorted((entry.get("languages") or {}).values()),
+        "flag": (entry.get("flags") or {}).get("png"),
+    }
+
+
+class TTLCache:
+    """Cache LRU borné en taille dont les entrées expirent après ``ttl`` secondes"""
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def __contains__(self, key):
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class CountryMetaStore:
+    """Instantané local + cache des requêtes en direct, partagé par toutes les sessions"""
+
+    def __init__(self, path=META_PATH, base_url=RESTCOUNTRIES_URL, ttl=3600, maxsize=256, failure_ttl=60):
+        self.path = path
+        self.base_url = base_url.rstrip("/")
+        self.snapshot = read_json(path, default={})
+        self.live = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.failure_ttl = failure_ttl
+        self._write_lock = threading.Lock()
+
+    def get(self, iso3):
+        """Métadonnées d'un pays, ou None si elles sont indisponibles"""
+        if not iso3:
+            return None
+        info = self.snapshot.get(iso3)
+        if info is not None:
+            return info
+        if iso3 in self.live:
+            return self.live.get(iso3)
+        try:
+            info = self._fetch(iso3)
+        except http_client.CircuitOpenError:
+            # API déjà en panne : rien n'a été demandé, on réessaiera quand le disjoncteur se refermera
+            return None
+        if info is None:
+            # Échec gardé peu de temps : pas de requête à chaque clic, mais pas de panneau masqué une heure
+            self.live.set(iso3, None, ttl=self.failure_ttl)
+        else:
+            self.live.set(iso3, info)
+            self._add_to_snapshot(iso3, info)
+        return info
+
+    def _fetch(self, iso3):
+        try:
+            r = http_client.get(f"{self.base_url}/v3.1/alpha/{iso3}", params={"fields": FIELDS}, endpoint="restcountries.alpha")
+            if r.status_code != 200:
+                return None
+            data = r.json()
+            return parse_country(data[0] if isinstance(data, list) else data)
+        except http_client.CircuitOpenError:
+            raise
+        except (requests.RequestException, ValueError, LookupError):
+            return None
+
+    def _add_to_snapshot(self, iso3, info):
+        """Ajoute un pays obtenu en direct à l'instantané sur disque (sans effet si ``data/`` est en lecture seule)"""
+        with self._write_lock:
+            snapshot = {**read_json(self.path, default={}), iso3: info}
+            try:
+                write_json_atomic(self.path, snapshot)
+            except OSError:
+                return
+            self.snapshot = snapshot
+
+
+def refresh_snapshot(path=META_PATH, base_url=RESTCOUNTRIES_URL):
+    """Télécharge tous les pays et remplace l'instantané local ; retourne le nombre de pays"""
+    r = http_client.get(f"{base_url.rstrip('/')}/v3.1/all", params={"fields": FIELDS}, endpoint="restcountries.all", timeout=(3.05, 30), deadline=120)
+    r.raise_for_status()
+    snapshot = {entry["cca3"]: parse_country(entry) for entry in r.json() if entry.get("cca3")}
+    write_json_atomic(path, snapshot)
+    return len(snapshot)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Instantané local des métadonnées pays")
+    parser.add_argument("--refresh", action="store_true", help="retélécharger l'instantané")
+    parser.add_argument("--base-url", default=RESTCOUNTRIES_URL, help="serveur compatible RestCountries (ex. serveur local de test)")
+    parser.add_argument("--path", default=META_PATH)
+    args = parser.parse_args()
+
+    if args.refresh:
+        print(f"{refresh_snapshot(args.path, args.base_url)} pays -> {args.path}")
+    else:
+        print(f"{len(read_json(args.path, default={}))} pays dans {args.path}")
@@ -0,0 +1,380 @@
+"""Chargement de la base des ONG et structures dérivées construites une seule fois.
+
+Les recherches par pays d'intervention passent par un index inversé
+``code ISO3 -> positions des lignes`` au lieu de rescanner la colonne
+``pays_intervention`` (chaînes séparées par des ``;``) à chaque rerun.
+
+Le CSV est validé puis converti en fichiers Arrow typés dans ``data/`` :
+- ``<nom>.arrow`` : la table des ONG (``pays`` et ``domaine`` en catégories) ;
+- ``<nom>.interventions.arrow`` : la table ``pays_intervention`` déjà éclatée
+  (une ligne par couple ONG / pays).
+Au démarrage, ces fichiers sont lus par memory-map au lieu de re-parser le CSV ;
+ils sont régénérés automatiquement quand le CSV change.
+
+Le ``DatasetManager`` surveille le CSV : quand il change, un nouvel instantané
+(table + index) est construit en arrière-plan puis substitué d'un bloc à
+l'ancien, qui reste servi entretemps. L'index des associations similaires est
+calculé ensuite, dans un autre thread : il n'allonge pas le démarrage.
+
+Conversion manuelle : ``python dataset.py [bdd_ong.csv]``
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import countries
+import facets
+import name_search
+import similar
+from fileutils import file_version
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow est optionnel : sans lui, on relit le CSV
+    pa = None
+
+REQUIRED_COLUMNS = ["nom", "pays", "domaine", "latitude", "longitude", "site_web", "pays_intervention"]
+# Le lien de don a porté deux noms selon les versions du fichier
+DONATION_LINK_COLUMNS = ["lien_don", "liens_dons"]
+CATEGORY_COLUMNS = ["pays", "domaine"]
+TEXT_COLUMNS = ["site_web", "lien_don"]
+FORMAT_VERSION = "1"
+
+
+def country_key(name):
+    """Clé d'un pays dans les index : son code ISO3, ou son nom normalisé s'il est inconnu"""
+    return countries.resolve(name) or countries.exact_key(name)
+
+
+def split_countries(value):
+    """Liste des pays d'une cellule ``pays_intervention`` (vide si la cellule est vide)"""
+    if not isinstance(value, str):
+        return []
+    return [c.strip() for c in value.split(";") if c.strip()]
+
+
+# ---------------------------
+# VALIDATION ET TYPAGE
+# ---------------------------
+
+def validate_schema(df):
+    """Vérifie les colonnes du CSV et retourne une table typée.
+
+    ``liens_dons`` est renommée en ``lien_don`` ; les liens vides deviennent des
+    chaînes vides ; ``pays`` et ``domaine`` passent en catégories.
+    """
+    df = df.copy()
+    links = [c for c in DONATION_LINK_COLUMNS if c in df.columns]
+    if len(links) > 1:
+        df["lien_don"] = df["lien_don"].fillna(df["liens_dons"])
+        df = df.drop(columns="liens_dons")
+    elif links == ["liens_dons"]:
+        df = df.rename(columns={"liens_dons": "lien_don"})
+    elif not links:
+        df["lien_don"] = ""
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans la base des ONG : {', '.join(missing)}")
+
+    for column in ("latitude", "longitude"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype("float32")
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].fillna("").astype(str).str.strip()
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype("category")
+    return df.reset_index(drop=True)
+
+
+def read_csv(csv_path):
+    """Lit et valide le CSV des ONG"""
+    return validate_schema(pd.read_csv(csv_path, sep=";"))
+
+
+def explode_interventions(df):
+    """Table ``pays_intervention`` éclatée : une ligne (row, key, label) par couple ONG / pays.
+
+    ``key`` est le code ISO3 (ou le nom normalisé si le pays est inconnu) et
+    ``label`` le libellé affiché. Chaque nom distinct n'est résolu qu'une fois.
+    """
+    names = df["pays_intervention"].str.split(";").explode().str.strip()
+    names = names[names.notna() & (names != "")]
+
+    resolver = countries.get_resolver()
+    keys, labels = {}, {}
+    for name in pd.unique(names):
+        iso3 = resolver.resolve(name)
+        keys[name] = iso3 or countries.exact_key(name)
+        labels[name] = resolver.name(iso3) if iso3 else name
+
+    table = pd.DataFrame({
+        "row": names.index.to_numpy(dtype=np.int32),
+        "key": names.map(keys).to_numpy(),
+        "label": names.map(labels).to_numpy(),
+    })
+    # Une ONG qui cite deux fois le même pays n'y compte qu'une fois
+    table = table.drop_duplicates(["row", "key"], ignore_index=True)
+    table["key"] = table["key"].astype("category")
+    return table
+
+
+def build_country_index(interventions):
+    """Index inversé clé pays -> positions (triées) des ONG, et libellé d'affichage par clé"""
+    index = {}
+    for key, rows in interventions.groupby("key", observed=True)["row"]:
+        index[key] = np.sort(rows.to_numpy(dtype=np.int64))
+    labels = interventions.drop_duplicates("key").set_index("key")["label"].to_dict()
+    return index, labels
+
+
+# ---------------------------
+# FORMAT COLONNAIRE (ARROW)
+# ---------------------------
+
+def columnar_paths(csv_path):
+    """Chemins des fichiers Arrow dérivés d'un CSV (dans ``data/`` à côté du CSV)"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(csv_path)), "data")
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return (
+        os.path.join(directory, f"{stem}.arrow"),
+        os.path.join(directory, f"{stem}.interventions.arrow"),
+    )
+
+
+def source_fingerprint(csv_path):
+    """Empreinte du CSV et de la table des pays : les fichiers Arrow sont périmés si elle change"""
+    countries_hash = hashlib.sha1(json.dumps(countries.COUNTRIES).encode("utf-8")).hexdigest()[:12]
+    return f"{FORMAT_VERSION}-{file_version(csv_path)}-{countries_hash}"
+
+
+def _write_arrow(df, path, fingerprint):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"source": fingerprint.encode()})
+    # Fichier temporaire propre à cet appel : deux écritures concurrentes ne se mélangent pas
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_arrow(path, fingerprint):
+    """Lit un fichier Arrow par memory-map ; None s'il est absent ou périmé"""
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if (table.schema.metadata or {}).get(b"source") != fingerprint.encode():
+        return None
+    return table.to_pandas()
+
+
+def ingest(csv_path):
+    """Valide le CSV et écrit les fichiers Arrow ; retourne (table, interventions)"""
+    if pa is None:
+        raise RuntimeError("pyarrow est nécessaire pour écrire le format colonnaire")
+    df = read_csv(csv_path)
+    interventions = explode_interventions(df)
+    fingerprint = source_fingerprint(csv_path)
+    table_path, interventions_path = columnar_paths(csv_path)
+    os.makedirs(os.path.dirname(table_path), exist_ok=True)
+    _write_arrow(df, table_path, fingerprint)
+    _write_arrow(interventions, interventions_path, fingerprint)
+    return df, interventions
+
+
+def load_tables(csv_path):
+    """Table des ONG + interventions : depuis les fichiers Arrow s'ils sont à jour, sinon depuis le CSV"""
+    if pa is None:
+        df = read_csv(csv_path)
+        return df, explode_interventions(df)
+
+    fingerprint = source_fingerprint(csv_path)
+    table_path, interventions_path = columnar_paths(csv_path)
+    df = _read_arrow(table_path, fingerprint)
+    interventions = _read_arrow(interventions_path, fingerprint) if df is not None else None
+    if df is not None and interventions is not None:
+        return df, interventions
+    try:
+        return ingest(csv_path)
+    except OSError:
+        # Dossier data/ non inscriptible : on travaille directement depuis le CSV
+        df = read_csv(csv_path)
+        return df, explode_interventions(df)
+
+
+class OngDataset:
+    """Table des ONG et index dérivés, partagés en lecture seule entre les sessions"""
+
+    _EMPTY = np.empty(0, dtype=np.int64)
+
+    def __init__(self, df, interventions=None, version=None, previous=None):
+        self.df = df
+        self.version = version
+        self.interventions = explode_interventions(df) if interventions is None else interventions
+        self.country_index, self.country_labels = build_country_index(self.interventions)
+        self.facets = facets.Facets(df, self.interventions, self.country_labels)
+        self.countries = self.facets.countries
+        self.domains = self.facets.domains
+        self.names = name_search.NameIndex(df["nom"])
+        # Page de dons : liste triée des noms et première ligne de chaque nom, partagées par les sessions
+        self.name_rows = {}
+        for pos, name in enumerate(self.names.names):
+            if name:
+                self.name_rows.setdefault(name, pos)
+        self.donation_names = sorted(self.name_rows)
+        # Clé pays du siège de chaque ONG (séparation ONG locales / internationales)
+        hq_keys = {p: country_key(p) for p in df["pays"].dropna().unique()}
+        self.hq_keys = df["pays"].map(hq_keys).to_numpy(dtype=object)
+        # Associations similaires : construites à part (``build_similar``), hors du chargement ;
+        # au rechargement, les domaines inchangés reprendront l'index précédent
+        self.similar = None
+        self._similar_lock = threading.Lock()
+        self._previous_similar = previous.similar if previous is not None else None
+
+    @classmethod
+    def from_csv(cls, csv_path, version=None, previous=None):
+        df, interventions = load_tables(csv_path)
+        return cls(df, interventions, version, previous)
+
+    def rows_for_country(self, country):
+        """Positions des ONG intervenant dans ``country`` (nom dans n'importe quelle langue ou code ISO3)"""
+        return self.country_index.get(country_key(country), self._EMPTY)
+
+    def ngos_in_country(self, country):
+        """Sous-tableau des ONG intervenant dans ``country``"""
+        return self.df.iloc[self.rows_for_country(country)]
+
+    def search_rows(self, query, limit=None):
+        """Positions des ONG dont le nom correspond à ``query``, les plus pertinentes d'abord"""
+        return self.names.search(query, limit)
+
+    def build_similar(self):
+        """Construit l'index des associations similaires (une seule fois, même appelé par plusieurs threads)"""
+        with self._similar_lock:
+            if self.similar is None:
+                self.similar = similar.SimilarIndex(
+                    self.facets.domain_rows, self.interventions, len(self.df),
+                    previous=self._previous_similar,
+                )
+                self._previous_similar = None
+        return self.similar
+
+    def similar_rows(self, row, limit=None):
+        """Positions des ONG du même domaine les plus proches de la ligne ``row`` ; vide tant que l'index n'est pas prêt"""
+        index = self.similar
+        if index is None:
+            return self._EMPTY
+        return index.similar(row, limit)
+
+    def local_mask(self, rows, country):
+        """Masque des ONG (parmi ``rows``) dont le siège est dans ``country``"""
+        return self.hq_keys[rows] == country_key(country)
+
+
+def content_hash(path):
+    """Empreinte du contenu d'un fichier (un simple ``touch`` ne la change pas)"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class DatasetManager:
+    """Instantané courant de la base des ONG, rechargé à chaud quand le CSV change.
+
+    ``current()`` ne bloque jamais sur une relecture, sauf au tout premier
+    chargement : la reconstruction tourne dans un thread et le nouvel
+    instantané remplace l'ancien d'un seul coup. Chaque instantané est un
+    ``OngDataset`` immuable ; une session qui le garde pendant son exécution
+    a donc une vue cohérente même si un rechargement a lieu entretemps.
+    """
+
+    def __init__(self, csv_path, check_interval=2.0):
+        self.csv_path = csv_path
+        self.check_interval = check_interval
+        self.generation = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._snapshot = None
+        self._file_version = None
+        self._last_check = 0.0
+
+    def _build(self):
+        digest = content_hash(self.csv_path)
+        if self._snapshot is not None and digest == self._snapshot.version:
+            # Fichier réécrit à l'identique : rien à reconstruire
+            return None
+        return OngDataset.from_csv(self.csv_path, version=digest, previous=self._snapshot)
+
+    def _swap(self, snapshot, version):
+        with self._lock:
+            if snapshot is not None:
+                self._snapshot = snapshot
+                self.generation += 1
+            self._file_version = version
+
+    def _rebuild(self):
+        version = file_version(self.csv_path)
+        try:
+            snapshot = self._build()
+        except (OSError, ValueError) as e:
+            # CSV en cours d'écriture ou invalide : on garde l'instantané précédent, et cette version
+            # du fichier est notée pour n'être pas relue toutes les ``check_interval`` s
+            self.last_error = str(e)
+            self._swap(None, version)
+            return
+        self._swap(snapshot, version)
+        self.last_error = None
+        if snapshot is not None:
+            # Associations similaires : calculées après la substitution, les sessions n'attendent pas
+            threading.Thread(target=snapshot.build_similar, name="similar-index", daemon=True).start()
+
+    def reload_async(self):
+        """Lance une reconstruction en arrière-plan (sans effet s'il y en a déjà une)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._thread
+            self._thread = threading.Thread(target=self._rebuild, name="dataset-reload", daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def check(self):
+        """Déclenche un rechargement si le fichier a changé depuis le dernier instantané"""
+        self._last_check = time.monotonic()
+        version = file_version(self.csv_path)
+        if version is not None and version != self._file_version:
+            return self.reload_async()
+        return None
+
+    def current(self):
+        """Instantané à utiliser pour cette exécution du script"""
+        if self._snapshot is None:
+            # Premier chargement : rien à servir en attendant, toutes les sessions attendent le même thread
+            self.reload_async().join()
+            if self._snapshot is None:
+                raise ValueError(self.last_error or f"Impossible de charger {self.csv_path}")
+        elif time.monotonic() - self._last_check > self.check_interval:
+            self.check()
+        return self._snapshot
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "bdd_ong.csv"
+    table, exploded = ingest(path)
+    print(f"{len(table)} ONG, {len(exploded)} couples ONG/pays -> {', '.join(columnar_paths(path))}")
@@ -0,0 +1,77 @@
+"""Facettes de la base des ONG (pays d'intervention, domaines) et leurs effectifs.
+
+Construites une fois par version de la base : listes de valeurs, nombre d'ONG
+par valeur et matrice croisée ``domaine x pays``. Quand un filtre change, les
+effectifs de l'autre facette se lisent dans la matrice (une ligne ou une
+colonne, ou la somme de quelques lignes) sans reparcourir la table.
+"""
+
+import numpy as np
+
+import countries
+
+
+class Facets:
+    """Valeurs et effectifs des facettes pays / domaine"""
+
+    def __init__(self, df, interventions, country_labels):
+        # Domaines : codes entiers par ligne (-1 si vide), dans l'ordre alphabétique
+        domain_col = df["domaine"].astype(str).where(df["domaine"].notna())
+        self.domains = sorted(domain_col.dropna().unique())
+        self._domain_pos = {d: i for i, d in enumerate(self.domains)}
+        domain_codes = domain_col.map(self._domain_pos).fillna(-1).to_numpy(dtype=np.int64)
+        self.domain_rows = {
+            d: np.flatnonzero(domain_codes == i)
+            for i, d in enumerate(self.domains)
+        }
+
+        # Pays : clés triées selon le libellé affiché
+        keys = sorted(country_labels, key=lambda k: countries.loose_key(country_labels[k]))
+        self.countries = [country_labels[k] for k in keys]
+        self._country_pos = {label: i for i, label in enumerate(self.countries)}
+        key_pos = {k: i for i, k in enumerate(keys)}
+
+        rows = interventions["row"].to_numpy(dtype=np.int64)
+        country_codes = interventions["key"].astype(object).map(key_pos).to_numpy(dtype=np.int64)
+        pair_domains = domain_codes[rows]
+        n_domains, n_countries = len(self.domains), len(self.countries)
+
+        self.total = len(df)
+        self.domain_totals = np.bincount(domain_codes[domain_codes >= 0], minlength=n_domains)
+        self.country_totals = np.bincount(country_codes, minlength=n_countries)
+        # matrix[d, c] : nombre d'ONG du domaine d intervenant dans le pays c
+        valid = pair_domains >= 0
+        self.matrix = np.bincount(
+            pair_domains[valid] * n_countries + country_codes[valid],
+            minlength=n_domains * n_countries,
+        ).reshape(n_domains, n_countries)
+
+    def _domain_indexes(self, domains):
+        return [self._domain_pos[d] for d in domains if d in self._domain_pos]
+
+    def country_counts(self, domains=None):
+        """Nombre d'ONG par pays (dans l'ordre de ``countries``), restreint aux ``domains`` s'il y en a"""
+        if not domains:
+            return self.country_totals
+        return self.matrix[self._domain_indexes(domains)].sum(axis=0)
+
+    def domain_counts(self, country=None):
+        """Nombre d'ONG par domaine (dans l'ordre de ``domains``), restreint au pays ``country`` s'il est donné"""
+        pos = self._country_pos.get(country)
+        if pos is None:
+            return self.domain_totals
+        return self.matrix[:, pos]
+
+    def total_count(self, domains=None):
+        """Nombre d'ONG tous pays confondus, restreint aux ``domains`` s'il y en a"""
+        if not domains:
+            return self.total
+        return int(self.domain_totals[self._domain_indexes(domains)].sum())
+
+    def country_labels_with_counts(self, domains=None):
+        """``{pays: "pays (n)"}`` pour les listes déroulantes"""
+        return {c: f"{c} ({n})" for c, n in zip(self.countries, self.country_counts(domains).tolist())}
+
+    def domain_labels_with_counts(self, country=None):
+        """``{domaine: "domaine (n)"}`` pour les listes déroulantes"""
+        return {d: f"{d} ({n})" for d, n in zip(self.domains, self.domain_counts(country).tolist())}
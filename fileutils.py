@@ -0,0 +1,39 @@
+"""Petits utilitaires de lecture/écriture des fichiers de cache dans ``data/``."""
+
+import json
+import os
+import tempfile
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def file_version(path):
+    """Empreinte d'un fichier (date de modification + taille) pour invalider les caches, None s'il n'existe pas"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def write_json_atomic(path, data):
+    """Écrit un JSON via un fichier temporaire pour ne jamais laisser de fichier tronqué"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_json(path, default=None):
+    """Lit un JSON, ou retourne ``default`` si le fichier n'existe pas"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
@@ -0,0 +1,241 @@
+"""Client HTTP commun à tous les appels sortants (GeoJSON, RestCountries, ReliefWeb).
+
+- une ``requests.Session`` partagée avec un pool de connexions keep-alive ;
+- des délais d'attente par hôte, toujours bornés ;
+- des nouvelles tentatives limitées avec backoff exponentiel (erreurs réseau, 429, 5xx),
+  toutes comprises dans un délai global par appel : un clic n'attend jamais
+  plus que ``deadline`` secondes, nouvelles tentatives et pauses comprises ;
+- un disjoncteur par hôte : après plusieurs échecs consécutifs, les appels
+  échouent immédiatement (``CircuitOpenError``) et les appelants se replient
+  sur leurs données en cache ;
+- des compteurs de latence et d'erreurs par point d'accès.
+
+Les URL des services peuvent être redirigées vers un serveur local de test via
+les variables d'environnement ``ONGAPP_GEOJSON_URL``, ``ONGAPP_RESTCOUNTRIES_URL``
+et ``ONGAPP_RELIEFWEB_URL`` (lues par les modules appelants).
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import profiling
+
+# (connexion, lecture) en secondes
+DEFAULT_TIMEOUT = (3.05, 10)
+HOST_TIMEOUTS = {
+    "raw.githubusercontent.com": (3.05, 15),
+    "restcountries.com": (3.05, 5),
+    "api.reliefweb.int": (3.05, 10),
+}
+DEFAULT_DEADLINE = 8.0  # durée maximale d'un appel, nouvelles tentatives comprises (s)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Levée sans appel réseau quand le disjoncteur d'un hôte est ouvert"""
+
+
+class CircuitBreaker:
+    """Disjoncteur simple : fermé -> ouvert après ``threshold`` échecs -> semi-ouvert après ``reset_after`` s"""
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Autorise un appel ? En semi-ouvert, un seul appel d'essai passe à la fois"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class EndpointStats:
+    """Compteurs d'un point d'accès : appels, erreurs, appels court-circuités, latences"""
+
+    __slots__ = ("calls", "errors", "rejected", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.calls = self.errors = self.rejected = 0
+        self.total_ms = self.max_ms = 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class HttpClient:
+    """Session partagée + délais, nouvelles tentatives, disjoncteurs et statistiques"""
+
+    def __init__(self, host_timeouts=None, default_timeout=DEFAULT_TIMEOUT, retries=2, backoff=0.3,
+                 failure_threshold=5, reset_after=30.0, pool_maxsize=10, deadline=DEFAULT_DEADLINE):
+        self.host_timeouts = dict(HOST_TIMEOUTS if host_timeouts is None else host_timeouts)
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.deadline = deadline
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+
+        # Nouvelles tentatives faites par ``get`` (et non par urllib3) : elles restent dans le délai global
+        adapter = HTTPAdapter(max_retries=0, pool_connections=8, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_after)
+            return breaker
+
+    def _endpoint_stats(self, endpoint):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            return stats
+
+    def _pause(self, attempt, response=None):
+        """Attente avant la tentative suivante : backoff exponentiel, ou ``Retry-After`` s'il est plus long"""
+        pause = self.backoff * (2 ** attempt)
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            pause = max(pause, float(retry_after))
+        return pause
+
+    def _get_with_retries(self, url, params, timeout, deadline):
+        """GET avec nouvelles tentatives tant qu'elles tiennent avant ``deadline`` (horloge monotone)"""
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        attempt = 0
+        while True:
+            remaining = max(deadline - time.monotonic(), 0.001)
+            response = None
+            try:
+                response = self.session.get(
+                    url, params=params, timeout=(min(connect_timeout, remaining), min(read_timeout, remaining)),
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+                pause = self._pause(attempt)
+                if time.monotonic() + pause >= deadline:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                pause = self._pause(attempt, response)
+                if time.monotonic() + pause >= deadline:
+                    return response
+                response.close()
+            time.sleep(pause)
+            attempt += 1
+
+    def get(self, url, params=None, endpoint=None, timeout=None, deadline=None):
+        """GET borné dans le temps (``deadline`` s au plus, nouvelles tentatives comprises).
+
+        Les réponses 429 et 5xx et les erreurs réseau comptent comme des échecs.
+        """
+        parts = urlsplit(url)
+        host = parts.netloc
+        endpoint = endpoint or f"{host}{parts.path}"
+        breaker = self._breaker(host)
+        stats = self._endpoint_stats(endpoint)
+
+        if not breaker.allow():
+            with self._lock:
+                stats.rejected += 1
+            raise CircuitOpenError(f"Circuit ouvert pour {host}")
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self._get_with_retries(
+                url, params,
+                timeout or self.host_timeouts.get(parts.hostname, self.default_timeout),
+                time.monotonic() + (deadline or self.deadline),
+            )
+            failed = response.status_code in RETRY_STATUSES or response.status_code >= 500
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            profiling.record_ms(f"http.{endpoint}", elapsed_ms)
+            with self._lock:
+                stats.calls += 1
+                stats.errors += failed
+                stats.total_ms += elapsed_ms
+                stats.max_ms = max(stats.max_ms, elapsed_ms)
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+    def stats(self):
+        """Compteurs par point d'accès et état des disjoncteurs par hôte"""
+        with self._lock:
+            endpoints = {name: s.as_dict() for name, s in self._stats.items()}
+            breakers = dict(self._breakers)
+        return {
+            "endpoints": endpoints,
+            "breakers": {host: b.state for host, b in breakers.items()},
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Client partagé par tout le processus"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def get(url, params=None, endpoint=None, timeout=None, deadline=None):
+    return get_client().get(url, params=params, endpoint=endpoint, timeout=timeout, deadline=deadline)
@@ -0,0 +1,327 @@
+"""Registre local des dons (SQLite en mode WAL), partagé par toutes les sessions.
+
+- une table ``dons`` indexée par utilisateur, association et domaine ;
+- des tables d'agrégats (total par utilisateur, par utilisateur et domaine,
+  par domaine) tenues à jour par des triggers dans la même transaction que
+  l'insertion : la page « Mes dons » lit quelques lignes, quel que soit le
+  nombre de dons de l'utilisateur ;
+- un seul thread écrit : les dons arrivant en même temps de plusieurs sessions
+  sont validés ensemble dans une transaction (écritures groupées), et
+  ``record`` attend la validation avant de rendre la main. Si le lot échoue,
+  ses dons sont repris un par un : seul le don fautif est refusé. Un don que
+  le thread d'écriture n'a pas encore pris à l'expiration de l'attente est
+  retiré de la file : il ne sera jamais enregistré et peut être refait.
+
+Les tableaux de bord globaux lisent des agrégats par période (jour, mois) et
+par dimension (association, domaine, pays, méthode de paiement) tenus à jour
+de la même façon : leur taille dépend du nombre de périodes et de valeurs,
+pas du nombre de dons.
+
+Les montants sont stockés en centimes pour que les sommes restent exactes.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from fileutils import DATA_DIR
+
+LEDGER_PATH = os.path.join(DATA_DIR, "dons.sqlite3")
+BATCH_SIZE = 100  # dons au plus par transaction
+WRITE_TIMEOUT = 5.0  # attente maximale de la validation d'un don (s)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dons (
+    id INTEGER PRIMARY KEY,
+    user_email TEXT NOT NULL,
+    association TEXT NOT NULL,
+    pays TEXT,
+    domaine TEXT NOT NULL DEFAULT '',
+    montant_cents INTEGER NOT NULL CHECK (montant_cents > 0),
+    methode TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dons_user ON dons (user_email, id);
+CREATE INDEX IF NOT EXISTS dons_association ON dons (association);
+CREATE INDEX IF NOT EXISTS dons_domaine ON dons (domaine);
+
+CREATE TABLE IF NOT EXISTS totaux_utilisateur (
+    user_email TEXT PRIMARY KEY,
+    nombre INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totaux_utilisateur_domaine (
+    user_email TEXT NOT NULL,
+    domaine TEXT NOT NULL,
+    nombre INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL,
+    PRIMARY KEY (user_email, domaine)
+);
+CREATE TABLE IF NOT EXISTS totaux_domaine (
+    domaine TEXT PRIMARY KEY,
+    nombre INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS dons_agregats AFTER INSERT ON dons BEGIN
+    INSERT INTO totaux_utilisateur VALUES (NEW.user_email, 1, NEW.montant_cents)
+        ON CONFLICT (user_email) DO UPDATE SET
+            nombre = nombre + 1, total_cents = total_cents + NEW.montant_cents;
+    INSERT INTO totaux_utilisateur_domaine VALUES (NEW.user_email, NEW.domaine, 1, NEW.montant_cents)
+        ON CONFLICT (user_email, domaine) DO UPDATE SET
+            nombre = nombre + 1, total_cents = total_cents + NEW.montant_cents;
+    INSERT INTO totaux_domaine VALUES (NEW.domaine, 1, NEW.montant_cents)
+        ON CONFLICT (domaine) DO UPDATE SET
+            nombre = nombre + 1, total_cents = total_cents + NEW.montant_cents;
+END;
+"""
+
+# Agrégats par période : nom -> longueur du préfixe de la date ISO (AAAA-MM-JJ / AAAA-MM)
+PERIODS = {"jour": 10, "mois": 7}
+# Dimensions des tableaux de bord : nom -> colonne de ``dons``
+DIMENSIONS = {"association": "association", "domaine": "domaine", "pays": "pays", "methode": "methode"}
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agregats_periode (
+    periode TEXT NOT NULL,
+    debut TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    valeur TEXT NOT NULL,
+    nombre INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL,
+    PRIMARY KEY (periode, dimension, debut, valeur)
+);
+"""
+
+
+_ROLLUP_KEYS = [
+    (period, length, dimension, column)
+    for period, length in PERIODS.items()
+    for dimension, column in DIMENSIONS.items()
+]
+
+ROLLUP_TRIGGER = "CREATE TRIGGER IF NOT EXISTS dons_agregats_periode AFTER INSERT ON dons BEGIN\n" + "".join(
+    f"""    INSERT INTO agregats_periode VALUES (
+        '{period}', substr(NEW.created_at, 1, {length}), '{dimension}', coalesce(NEW.{column}, ''), 1, NEW.montant_cents)
+        ON CONFLICT (periode, dimension, debut, valeur) DO UPDATE SET
+            nombre = nombre + 1, total_cents = total_cents + NEW.montant_cents;
+"""
+    for period, length, dimension, column in _ROLLUP_KEYS
+) + "END;"
+
+# Reconstruction complète, pour une base créée avant les agrégats par période
+ROLLUP_BACKFILL = [
+    f"""INSERT INTO agregats_periode
+    SELECT '{period}', substr(created_at, 1, {length}), '{dimension}', coalesce({column}, ''), count(*), sum(montant_cents)
+    FROM dons GROUP BY 2, 4"""
+    for period, length, dimension, column in _ROLLUP_KEYS
+]
+
+INSERT = """
+INSERT INTO dons (user_email, association, pays, domaine, montant_cents, methode, created_at)
+VALUES (:user_email, :association, :pays, :domaine, :montant_cents, :methode, :created_at)
+"""
+
+
+def connect(path):
+    """Connexion configurée pour un accès concurrent (WAL, attente si la base est verrouillée)"""
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def to_cents(amount):
+    return int(round(float(amount) * 100))
+
+
+class DonationPendingError(TimeoutError):
+    """Attente expirée alors que le don est en cours d'écriture : il sera enregistré ou refusé, ne pas le refaire"""
+
+
+class _PendingDonation:
+    __slots__ = ("row", "done", "error")
+
+    def __init__(self, row):
+        self.row = row
+        self.done = threading.Event()
+        self.error = None
+
+
+class Ledger:
+    """Registre des dons : écritures groupées par un thread dédié, lectures par thread appelant"""
+
+    def __init__(self, path=LEDGER_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        self._create_rollups(conn)
+        conn.close()
+        self._local = threading.local()
+        self._pending = []
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="ledger-writer", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _create_rollups(conn):
+        """Crée les agrégats par période ; les remplit à partir des dons existants s'ils sont nouveaux"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'dons_agregats_periode'"
+            ).fetchone()
+            if not exists:
+                conn.execute(ROLLUP_SCHEMA)
+                conn.execute("DELETE FROM agregats_periode")
+                for statement in ROLLUP_BACKFILL:
+                    conn.execute(statement)
+                conn.execute(ROLLUP_TRIGGER)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self):
+        """Connexion de lecture propre au thread appelant"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    # --- Écriture ---
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+            try:
+                self._insert(conn, batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0].error = e
+                else:
+                    # Un don refusé ne doit pas faire échouer ceux des autres sessions : reprise un par un
+                    for p in batch:
+                        try:
+                            self._insert(conn, [p])
+                        except Exception as row_error:
+                            p.error = row_error
+            for p in batch:
+                p.done.set()
+
+    @staticmethod
+    def _insert(conn, batch):
+        """Insère les dons en une transaction ; annulée (puis erreur relancée) si l'un d'eux échoue"""
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT, [p.row for p in batch])
+            conn.execute("COMMIT")
+        except Exception:
+            # Le thread continue de servir les dons suivants : la transaction ne doit pas rester ouverte
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            raise
+
+    def record(self, user_email, association, pays, domaine, montant, methode, wait=WRITE_TIMEOUT):
+        """Enregistre un don ; attend (au plus ``wait`` s) qu'il soit validé sur disque.
+
+        Attente expirée : ``TimeoutError`` si le don n'était pas encore pris par
+        le thread d'écriture (il est abandonné), ``DonationPendingError`` s'il
+        est en cours d'écriture.
+        """
+        pending = _PendingDonation({
+            "user_email": user_email,
+            "association": association,
+            "pays": pays if isinstance(pays, str) else None,
+            "domaine": domaine if isinstance(domaine, str) else "",
+            "montant_cents": to_cents(montant),
+            "methode": methode,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
+        with self._cond:
+            self._pending.append(pending)
+            self._cond.notify()
+        if wait:
+            if not pending.done.wait(wait):
+                with self._cond:
+                    queued = pending in self._pending
+                    if queued:
+                        self._pending.remove(pending)
+                if queued:
+                    raise TimeoutError("Le registre des dons n'a pas répondu à temps ; le don n'a pas été enregistré")
+                if not pending.done.is_set():
+                    raise DonationPendingError("Le don est en cours d'enregistrement")
+            if pending.error is not None:
+                raise pending.error
+        return pending.done
+
+    # --- Lecture ---
+
+    def user_summary(self, user_email):
+        """``(nombre de dons, total en euros)`` de l'utilisateur"""
+        row = self._conn().execute(
+            "SELECT nombre, total_cents FROM totaux_utilisateur WHERE user_email = ?", (user_email,)
+        ).fetchone()
+        return (row["nombre"], row["total_cents"] / 100) if row else (0, 0.0)
+
+    def user_domain_totals(self, user_email):
+        """``[{domaine, nombre, montant}]`` de l'utilisateur, par montant décroissant"""
+        rows = self._conn().execute(
+            "SELECT domaine, nombre, total_cents FROM totaux_utilisateur_domaine "
+            "WHERE user_email = ? ORDER BY total_cents DESC", (user_email,)
+        ).fetchall()
+        return [{"domaine": r["domaine"], "nombre": r["nombre"], "montant": r["total_cents"] / 100} for r in rows]
+
+    def domain_totals(self):
+        """``[{domaine, nombre, montant}]`` tous utilisateurs confondus"""
+        rows = self._conn().execute(
+            "SELECT domaine, nombre, total_cents FROM totaux_domaine ORDER BY total_cents DESC"
+        ).fetchall()
+        return [{"domaine": r["domaine"], "nombre": r["nombre"], "montant": r["total_cents"] / 100} for r in rows]
+
+    def rollup(self, dimension, period="mois", since=None):
+        """Agrégats ``[{debut, valeur, nombre, montant}]`` d'une dimension, par période croissante.
+
+        ``since`` (date ISO) limite aux périodes commençant à partir de cette date.
+        """
+        if dimension not in DIMENSIONS or period not in PERIODS:
+            raise ValueError(f"Agrégat inconnu : {period} x {dimension}")
+        rows = self._conn().execute(
+            "SELECT debut, valeur, nombre, total_cents FROM agregats_periode "
+            "WHERE periode = ? AND dimension = ? AND debut >= ? ORDER BY debut, total_cents DESC",
+            (period, dimension, (since or "")[:PERIODS[period]]),
+        ).fetchall()
+        return [
+            {"debut": r["debut"], "valeur": r["valeur"], "nombre": r["nombre"], "montant": r["total_cents"] / 100}
+            for r in rows
+        ]
+
+    def user_donations(self, user_email, limit=100, offset=0):
+        """Derniers dons de l'utilisateur (les plus récents d'abord)"""
+        rows = self._conn().execute(
+            "SELECT association, pays, domaine, montant_cents, methode, created_at FROM dons "
+            "WHERE user_email = ? ORDER BY id DESC LIMIT ? OFFSET ?", (user_email, limit, offset)
+        ).fetchall()
+        return [
+            {
+                "date": r["created_at"],
+                "association": r["association"],
+                "pays": r["pays"],
+                "domaine": r["domaine"],
+                "montant": r["montant_cents"] / 100,
+                "methode_de_paiement": r["methode"],
+            }
+            for r in rows
+        ]
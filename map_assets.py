@@ -0,0 +1,487 @@
+"""Ressources de la carte : GeoJSON mondial, table IDH et couleurs pré-calculées.
+
+Le GeoJSON est téléchargé une seule fois puis conservé dans ``data/`` : les
+reruns Streamlit ne dépendent plus du réseau pour afficher la carte.
+
+Les sièges des ONG sont regroupés par cellule de grille côté Python, puis
+envoyés en un seul tableau compact à un ``FastMarkerCluster`` qui les
+agrège à nouveau dans le navigateur selon le zoom.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+
+import folium
+import pandas as pd
+from folium.plugins import FastMarkerCluster
+
+import countries
+import http_client
+from fileutils import DATA_DIR, write_json_atomic
+
+GEOJSON_URL = os.environ.get(
+    "ONGAPP_GEOJSON_URL",
+    "https://raw.githubusercontent.com/python-visualization/folium/main/examples/data/world-countries.json",
+)
+GEOJSON_PATH = os.path.join(DATA_DIR, "world-countries.json")
+
+# Niveaux de détail de la géométrie : (nom, zoom maximal servi, tolérance de
+# simplification en degrés, nombre de décimales conservées). Le dernier niveau
+# correspond au GeoJSON d'origine.
+GEOMETRY_LEVELS = [
+    ("low", 3, 0.25, 2),
+    ("medium", 5, 0.05, 3),
+    ("full", None, None, None),
+]
+
+# Dictionnaire IDH simplifié (ONU 2023)
+IDH_DATA = {
+    "Iceland": 0.972, "Norway": 0.970, "Switzerland": 0.970, "Denmark": 0.962, "Germany": 0.959, "Sweden": 0.959, "Australia": 0.958, "Hong Kong, China (SAR)": 0.955, "Netherlands": 0.955, "Belgium": 0.951, "Ireland": 0.949, "Finland": 0.948, "Singapore": 0.946, "United Kingdom": 0.946, "United Arab Emirates": 0.940, "Canada": 0.939, "Liechtenstein": 0.938, "New Zealand": 0.938, "United States of America": 0.938, "South Korea": 0.937, "Slovenia": 0.931, "Austria": 0.930, "Japan": 0.925, "Malta": 0.924, "Luxembourg": 0.922, "France": 0.920, "Israel": 0.919, "Spain": 0.918, "Czechia": 0.915, "Italy": 0.915, "San Marino": 0.915, "Andorra": 0.913, "Cyprus": 0.913, "Greece": 0.908, "Poland": 0.906, "Estonia": 0.905, "Saudi Arabia": 0.900, "Bahrain": 0.899, "Lithuania": 0.895, "Portugal": 0.890, "Croatia": 0.889, "Latvia": 0.889, "Qatar": 0.886, "Slovakia": 0.880, "Chile": 0.878, "Hungary": 0.870, "Argentina": 0.865, "Montenegro": 0.862, "Uruguay": 0.862, "Oman": 0.858, "Türkiye": 0.853, "Kuwait": 0.852, "Antigua and Barbuda": 0.851, "Seychelles": 0.848, "Bulgaria": 0.845, "Romania": 0.845, "Georgia": 0.844, "Saint Kitts and Nevis": 0.840, "Panama": 0.839, "Brunei": 0.837, "Kazakhstan": 0.837, "Costa Rica": 0.833, "Republic of Serbia": 0.833, "Russia": 0.832, "Belarus": 0.824, "Bahamas": 0.820, "Malaysia": 0.819, "Macedonia": 0.815, "Armenia": 0.811, "Barbados": 0.811, "Albania": 0.810, "Trinidad and Tobago": 0.807, "Mauritius": 0.806, "Bosnia and Herzegovina": 0.804, "Iran (Islamic Republic of)": 0.799, "Saint Vincent and the Grenadines": 0.798, "Thailand": 0.798, "China": 0.797, "Peru": 0.794, "Grenada": 0.791, "Azerbaijan": 0.789, "Mexico": 0.789, "Colombia": 0.788, "Brazil": 0.786, "Palau": 0.786, "Moldova": 0.785, "Ukraine": 0.779, "Ecuador": 0.777, "Dominican Republic": 0.776, "Guyana": 0.776, "Sri Lanka": 0.776, "Tonga": 0.769, "Maldives": 0.766, "Viet Nam": 0.766, "Turkmenistan": 0.764, "Algeria": 0.763, "Cuba": 0.762, "Dominica": 0.761, "Paraguay": 0.756, "Egypt": 0.754, "Jordan": 0.754, "Lebanon": 0.752, "Saint Lucia": 0.748, "Mongolia": 0.747, "Tunisia": 0.746, "Kosovo": 0.742, "South Africa": 0.741, "Uzbekistan": 0.740, "Bolivia": 0.733, "Gabon": 0.733, "Marshall Islands": 0.733, "Botswana": 0.731, "Fiji": 0.731, "Indonesia": 0.728, "Suriname": 0.722, "Belize": 0.721, "Libya": 0.721, "Jamaica": 0.720, "Kyrgyzstan": 0.720, "Philippines": 0.720, "Morocco": 0.710, "Venezuela (Bolivarian Republic of)": 0.709, "Samoa": 0.708, "Nicaragua": 0.706, "Nauru": 0.703, "Bhutan": 0.698, "Eswatini (Kingdom of)": 0.695, "Iraq": 0.695, "Tajikistan": 0.691, "Tuvalu": 0.689, "Bangladesh": 0.685, "India": 0.685, "El Salvador": 0.678, "Equatorial Guinea": 0.674, "Palestine, State of": 0.674, "Cabo Verde": 0.668, "Namibia": 0.665, "Guatemala": 0.662, "Republic of the Congo": 0.649, "Honduras": 0.645, "Kiribati": 0.644, "Sao Tome and Principe": 0.637, "Timor-Leste": 0.634, "Ghana": 0.628, "Kenya": 0.628, "Nepal": 0.622, "Vanuatu": 0.621, "Lao People's Democratic Republic": 0.617, "Angola": 0.616, "Micronesia (Federated States of)": 0.615, "Myanmar": 0.609, "Cambodia": 0.606, "Comoros": 0.603, "Zimbabwe": 0.598, "Zambia": 0.595, "Cameroon": 0.588, "Solomon Islands": 0.584, "Ivory Coast": 0.582, "Uganda": 0.582, "Rwanda": 0.578, "Papua New Guinea": 0.576, "Togo": 0.571, "Syrian Arab Republic": 0.564, "Mauritania": 0.563, "Nigeria": 0.560, "Tanzania (United Republic of)": 0.555, "Haiti": 0.554, "Lesotho": 0.550, "Pakistan": 0.544, "Senegal": 0.530, "Gambia": 0.524, "Congo (Democratic Republic of the)": 0.522, "Malawi": 0.517, "Benin": 0.515, "Guinea Bissau": 0.514, "Djibouti": 0.513, "Sudan": 0.511, "Liberia": 0.510, "Eritrea": 0.503, "Guinea": 0.500, "Ethiopia": 0.497, "Afghanistan": 0.496, "Mozambique": 0.493, "Madagascar": 0.487, "Yemen": 0.470, "Sierra Leone": 0.467, "Burkina Faso": 0.459, "Burundi": 0.439, "Mali": 0.419, "Niger": 0.419, "Chad": 0.416, "Central African Republic": 0.414, "Somalia": 0.404, "South Sudan": 0.388
+}
+
+# Table IDH indexée par code ISO3 (les libellés ONU sont résolus une fois au chargement)
+IDH_BY_ISO3 = {countries.resolve(name): idh for name, idh in IDH_DATA.items()}
+
+# Paliers de couleur IDH (seuil minimal, couleur), du plus élevé au plus faible
+IDH_COLORS = [
+    (0.9, "#2c7bb6"),
+    (0.8, "#abd9e9"),
+    (0.7, "#ffffbf"),
+    (0.6, "#fdae61"),
+]
+IDH_LOW_COLOR = "#d7191c"
+IDH_MISSING_COLOR = "#e0e0e0"
+
+BORDER_STYLE = {"color": "#555", "weight": 0.4, "fillOpacity": 0.8}
+HIGHLIGHT_STYLE = {"fillColor": "#ffcc66", "color": "#333", "weight": 1, "fillOpacity": 0.9}
+
+
+def idh_color(idh):
+    """Retourne la couleur de remplissage associée à une valeur d'IDH"""
+    if idh is None:
+        return IDH_MISSING_COLOR
+    for threshold, color in IDH_COLORS:
+        if idh >= threshold:
+            return color
+    return IDH_LOW_COLOR
+
+
+def feature_iso3(feature):
+    """Code ISO3 d'un pays du GeoJSON (identifiant de l'entité, sinon son nom)"""
+    return countries.resolve(feature.get("id")) or countries.resolve(feature.get("properties", {}).get("name"))
+
+
+def download_world_geojson(path=GEOJSON_PATH, url=GEOJSON_URL):
+    """Télécharge le GeoJSON mondial et le sauvegarde sur disque"""
+    response = http_client.get(url, endpoint="geojson")
+    response.raise_for_status()
+    data = response.json()
+    write_json_atomic(path, data)
+    return data
+
+
+def ensure_world_geojson(path=GEOJSON_PATH):
+    """S'assure que la copie locale du GeoJSON existe (téléchargement au premier lancement)"""
+    if not os.path.exists(path):
+        download_world_geojson(path)
+
+
+def load_world_geojson(path=GEOJSON_PATH, refresh=False):
+    """Charge le GeoJSON mondial depuis la copie locale (``refresh`` force un nouveau téléchargement)"""
+    if refresh or not os.path.exists(path):
+        return download_world_geojson(path)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def assets_version(path=GEOJSON_PATH, idh_data=IDH_DATA):
+    """Empreinte des données de la carte : change si le GeoJSON ou la table IDH change"""
+    try:
+        stat = os.stat(path)
+        geo_part = f"{stat.st_mtime_ns}-{stat.st_size}"
+    except FileNotFoundError:
+        geo_part = "absent"
+    idh_part = hashlib.sha1(
+        json.dumps([idh_data, countries.COUNTRIES], sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+    return f"{geo_part}-{idh_part}"
+
+
+def styled_geojson(geojson_data, idh_by_iso3=IDH_BY_ISO3):
+    """Copie du GeoJSON où chaque pays porte déjà son code ISO3, son IDH et sa couleur"""
+    styled = copy.deepcopy(geojson_data)
+    for feature in styled["features"]:
+        props = feature.setdefault("properties", {})
+        iso3 = feature_iso3(feature)
+        idh = idh_by_iso3.get(iso3)
+        props["iso3"] = iso3
+        props["idh"] = idh
+        props["fillColor"] = idh_color(idh)
+    return styled
+
+
+# ---------------------------
+# GÉOMÉTRIE MULTI-RÉSOLUTION
+# ---------------------------
+
+def _point_segment_distance(p, a, b):
+    """Distance (en degrés) du point p au segment [a, b]"""
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return ((px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2) ** 0.5
+
+
+def simplify_line(points, tolerance):
+    """Simplification de Douglas-Peucker (version itérative)"""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            dist = _point_segment_distance(points[i], points[first], points[last])
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def _quantize_ring(ring, precision):
+    """Arrondit les coordonnées et supprime les points devenus identiques"""
+    out = []
+    for x, y, *_ in ring:
+        point = [round(x, precision), round(y, precision)]
+        if not out or out[-1] != point:
+            out.append(point)
+    return out
+
+
+def _simplify_ring(ring, tolerance, precision):
+    """Anneau simplifié et quantifié, ou None s'il dégénère (moins de 4 points)"""
+    simplified = _quantize_ring(simplify_line(ring, tolerance), precision)
+    return simplified if len(simplified) >= 4 else None
+
+
+def _simplify_polygon(rings, tolerance, precision):
+    outer = _simplify_ring(rings[0], tolerance, precision)
+    if outer is None:
+        return None
+    holes = [h for h in (_simplify_ring(r, tolerance, precision) for r in rings[1:]) if h]
+    return [outer] + holes
+
+
+def simplify_geometry(geometry, tolerance, precision):
+    """Simplifie un Polygon/MultiPolygon en gardant au moins un polygone par pays"""
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return geometry
+
+    kept = [p for p in (_simplify_polygon(rings, tolerance, precision) for rings in polygons) if p]
+    if not kept:
+        # Pays minuscule : on garde le plus grand polygone, seulement quantifié
+        largest = max(polygons, key=lambda rings: len(rings[0]))
+        kept = [[_quantize_ring(largest[0], precision)]]
+
+    if len(kept) == 1:
+        return {"type": "Polygon", "coordinates": kept[0]}
+    return {"type": "MultiPolygon", "coordinates": kept}
+
+
+def simplify_geojson(geojson_data, tolerance, precision):
+    """Version simplifiée et quantifiée d'une FeatureCollection"""
+    features = []
+    for feature in geojson_data["features"]:
+        simplified = dict(feature)
+        if feature.get("geometry"):
+            simplified["geometry"] = simplify_geometry(feature["geometry"], tolerance, precision)
+        features.append(simplified)
+    return {**geojson_data, "features": features}
+
+
+def level_for_zoom(zoom):
+    """Plus petit niveau de détail suffisant pour un niveau de zoom donné"""
+    for name, max_zoom, _, _ in GEOMETRY_LEVELS:
+        if max_zoom is None or zoom is None or zoom <= max_zoom:
+            return name
+    return GEOMETRY_LEVELS[-1][0]
+
+
+def level_path(level, path=GEOJSON_PATH):
+    """Chemin du fichier pré-calculé d'un niveau de détail"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{level}{ext}"
+
+
+def load_geojson_level(level, path=GEOJSON_PATH):
+    """Charge un niveau de détail, en le recalculant si le GeoJSON source est plus récent"""
+    params = {name: (tolerance, precision) for name, _, tolerance, precision in GEOMETRY_LEVELS}
+    tolerance, precision = params[level]
+    if tolerance is None:
+        return load_world_geojson(path)
+
+    cached = level_path(level, path)
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        with open(cached, encoding="utf-8") as f:
+            return json.load(f)
+
+    data = simplify_geojson(load_world_geojson(path), tolerance, precision)
+    write_json_atomic(cached, data)
+    return data
+
+
+def _count_vertices(coordinates):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return 1
+    return sum(_count_vertices(c) for c in coordinates)
+
+
+def geometry_levels_report(path=GEOJSON_PATH):
+    """Taille (octets bruts et gzip) et nombre de sommets de chaque niveau de détail"""
+    import gzip
+
+    report = []
+    for name, max_zoom, _, _ in GEOMETRY_LEVELS:
+        data = load_geojson_level(name, path)
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        vertices = sum(_count_vertices(f["geometry"]["coordinates"]) for f in data["features"] if f.get("geometry"))
+        report.append({
+            "level": name,
+            "max_zoom": max_zoom,
+            "vertices": vertices,
+            "bytes": len(payload),
+            "gzip_bytes": len(gzip.compress(payload)),
+        })
+    return report
+
+
+def idh_style(feature):
+    """Style d'un pays : la couleur est lue dans les propriétés pré-calculées"""
+    color = feature["properties"].get("fillColor", IDH_MISSING_COLOR)
+    return {"fillColor": color, **BORDER_STYLE}
+
+
+def idh_highlight(_):
+    return HIGHLIGHT_STYLE
+
+
+# folium modifie la carte pendant son rendu (``st_folium`` y attache aussi la
+# couche des sièges) : une carte partagée n'est rendue que par une session à la fois
+RENDER_LOCK = threading.Lock()
+
+
+class _RenderedBlock(folium.Element):
+    """Bloc déjà rendu : réutilise un gabarit compilé au lieu de recompiler son texte"""
+
+    def __init__(self, template):
+        super().__init__()
+        self._template = template
+
+
+class _RenderOnce:
+    """Élément folium aux données figées, rendu une seule fois par figure.
+
+    ``st_folium`` rend toute la carte à chaque rerun ; branca recompile alors
+    en gabarit jinja le script de chaque élément, données JSON comprises
+    (pays, sièges). Les gabarits produits, et les enfants créés pendant le
+    rendu (``addTo`` vers le parent), sont gardés par noms de la figure, de
+    l'élément et de son parent : ``st_folium`` renomme les éléments à chaque
+    appel, toujours de la même façon. Seuls les noms et les gabarits sont
+    gardés : une carte retirée du cache n'est pas retenue par ses couches.
+
+    S'appuie sur le rendu interne de branca (``header`` / ``html`` / ``script``
+    de la figure, ``_children``) : les versions sont figées dans
+    ``requirements.txt`` et ``tests/test_map_assets.py`` compare le résultat à
+    celui de folium.
+    """
+
+    _rendered = None  # {(figure, nom, parent): ([(partie de la figure, gabarit)], enfants)}
+
+    def render(self, **kwargs):
+        figure = self.get_root()
+        name = self.get_name()
+        key = (figure.get_name(), name, self._parent.get_name())
+        if self._rendered is None:
+            self._rendered = {}
+        cached = self._rendered.get(key)
+        if cached is None:
+            super().render(**kwargs)
+            blocks = [
+                (part, getattr(figure, part)._children[name]._template)
+                for part in ("header", "html", "script")
+                if name in getattr(figure, part)._children
+            ]
+            self._rendered[key] = (blocks, dict(self._children))
+            return
+        blocks, children = cached
+        for part, template in blocks:
+            getattr(figure, part).add_child(_RenderedBlock(template), name=name)
+        self._children.clear()
+        self._children.update(children)
+        for child in children.values():
+            child.render(**kwargs)
+
+
+class StaticGeoJson(_RenderOnce, folium.GeoJson):
+    """Couche GeoJSON figée : rendu unique et emprise calculée une fois (``st_folium`` la redemande à chaque rerun)"""
+
+    _static_bounds = None
+
+    def _get_self_bounds(self):
+        if self._static_bounds is None:
+            self._static_bounds = super()._get_self_bounds()
+        return self._static_bounds
+
+
+class StaticFastMarkerCluster(_RenderOnce, FastMarkerCluster):
+    """Marqueurs des sièges, rendus une fois par carte"""
+
+
+def build_idh_map(styled_data, single_layer=True):
+    """Construit la carte Folium à partir du GeoJSON stylé.
+
+    ``single_layer=True`` produit une seule couche GeoJSON (un style, un survol
+    et une infobulle partagés) ; ``False`` conserve l'ancien rendu avec une
+    couche par pays, utile pour comparer les tailles de page.
+    """
+    # Carte moderne
+    m = folium.Map(location=[20, 0], zoom_start=2.3, tiles="CartoDB Voyager")
+
+    # Supprimer le contour bleu
+    m.get_root().html.add_child(folium.Element("""
+        <style>
+            path:focus { outline: none !important; }
+        </style>
+    """))
+
+    if single_layer:
+        StaticGeoJson(
+            styled_data,
+            name="IDH",
+            style_function=idh_style,
+            highlight_function=idh_highlight,
+            tooltip=folium.GeoJsonTooltip(fields=["name"], aliases=["Pays :"])
+        ).add_to(m)
+    else:
+        for feature in styled_data["features"]:
+            folium.GeoJson(
+                feature,
+                style_function=idh_style,
+                highlight_function=idh_highlight,
+                tooltip=folium.GeoJsonTooltip(fields=["name"], aliases=["Pays :"])
+            ).add_to(m)
+
+    # Rendu fait une fois ici : st_folium peut ensuite être appelé avec render=False
+    m.get_root().render()
+    return m
+
+
+# ---------------------------
+# SIÈGES DES ONG (MARQUEURS REGROUPÉS)
+# ---------------------------
+
+HQ_GRID_DECIMALS = 2  # cellules d'environ 1 km : les ONG d'une même ville partagent un marqueur
+HQ_MAX_CELLS = 20_000  # au-delà, la grille est élargie : la couche envoyée à chaque session reste bornée
+HQ_TOOLTIP_NAMES = 3
+
+# row = [lat, lon, nombre d'ONG, libellé]
+HQ_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {ongCount: row[2]});
+    marker.bindTooltip(row[3]);
+    return marker;
+}
+"""
+
+# Les grappes affichent le nombre d'ONG, pas le nombre de marqueurs
+HQ_CLUSTER_ICON = """
+function (cluster) {
+    var n = 0;
+    cluster.getAllChildMarkers().forEach(function (m) { n += m.options.ongCount; });
+    var size = n < 10 ? "small" : (n < 100 ? "medium" : "large");
+    return L.divIcon({
+        html: "<div><span>" + n + "</span></div>",
+        className: "marker-cluster marker-cluster-" + size,
+        iconSize: new L.Point(40, 40)
+    });
+}
+"""
+
+
+def hq_cells(df, decimals=HQ_GRID_DECIMALS, max_cells=HQ_MAX_CELLS):
+    """Sièges regroupés par cellule de grille : ``[[lat, lon, nombre, libellé], ...]``.
+
+    La taille du tableau dépend du nombre de lieux distincts, pas du nombre
+    d'ONG ; s'il dépasse ``max_cells``, les cellules sont élargies d'une
+    décimale à la fois.
+    """
+    lat, lon = df["latitude"].astype(float), df["longitude"].astype(float)
+    while decimals > 0:
+        distinct = pd.DataFrame({"lat": lat.round(decimals), "lon": lon.round(decimals)}).drop_duplicates()
+        if len(distinct) <= max_cells:
+            break
+        decimals -= 1
+    points = pd.DataFrame({
+        "lat": lat.round(decimals),
+        "lon": lon.round(decimals),
+        "nom": df["nom"].astype(str),
+    }).dropna(subset=["lat", "lon"])
+    cells = []
+    for (lat, lon), names in points.groupby(["lat", "lon"], sort=False)["nom"]:
+        distinct = list(dict.fromkeys(names))
+        shown = distinct[:HQ_TOOLTIP_NAMES]
+        label = ", ".join(shown) + (f" (+{len(distinct) - len(shown)})" if len(distinct) > len(shown) else "")
+        cells.append([lat, lon, len(names), label])
+    return cells
+
+
+def detach_layer(m, layer):
+    """Retire de la carte partagée la couche que ``st_folium(feature_group_to_add=...)`` y a laissée.
+
+    Sans cela, le rendu suivant de la carte (par n'importe quelle session)
+    embarquerait aussi cette couche dans le script de la carte.
+    """
+    for name, child in list(m._children.items()):
+        if child is layer:
+            del m._children[name]
+
+
+def build_hq_layer(cells):
+    """Couche des sièges à passer à ``st_folium(feature_group_to_add=...)``"""
+    layer = folium.FeatureGroup(name="Sièges des ONG")
+    StaticFastMarkerCluster(
+        cells, callback=HQ_MARKER_CALLBACK, icon_create_function=HQ_CLUSTER_ICON,
+        options={"showCoverageOnHover": False},
+    ).add_to(layer)
+    return layer
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gestion de la copie locale du GeoJSON mondial")
+    parser.add_argument("--refresh", action="store_true", help="retélécharger le GeoJSON même s'il existe déjà")
+    parser.add_argument("--levels", action="store_true", help="pré-calculer les niveaux de détail et afficher leur taille")
+    args = parser.parse_args()
+
+    geojson = load_world_geojson(refresh=args.refresh)
+    print(f"{len(geojson['features'])} pays -> {GEOJSON_PATH}")
+
+    if args.levels:
+        for row in geometry_levels_report():
+            print(f"{row['level']:>7} (zoom <= {row['max_zoom']}) : {row['vertices']} sommets, "
+                  f"{row['bytes']} octets, {row['gzip_bytes']} octets gzip")
@@ -0,0 +1,160 @@
+"""Recherche des ONG par nom, insensible aux accents et tolérante aux fautes de frappe.
+
+L'index est construit une fois au chargement de la base :
+- chaque nom est normalisé (sans accents, casse ni ponctuation) ;
+- un index inversé ``trigramme -> ONG`` mesure la proportion des trigrammes de la
+  requête présents dans chaque nom (``medcins`` trouve ``Médecins``) ;
+- les mots des noms, triés, permettent de trouver par dichotomie tous les noms
+  dont un mot commence par un mot de la requête (saisie au fil de l'eau).
+
+Une requête ne parcourt que les listes de postings de ses trigrammes et une
+tranche de la liste des mots : les scores sont cumulés sur ces seuls candidats.
+Quand ils dépassent ``DENSE_FRACTION`` des noms (requête très courante), un
+comptage dans un tableau de la taille de l'index revient moins cher que leur tri
+et le remplace. Le classement trie une clé entière unique par résultat.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+MIN_SIMILARITY = 0.5  # part minimale des trigrammes de la requête présents dans le nom
+WORD_PREFIX_BONUS = 1.0  # réparti entre les mots de la requête
+NAME_PREFIX_BONUS = 1.0  # le nom commence par la requête
+EXACT_BONUS = 1.0  # nom identique à la requête
+SCORE_SCALE = 1 << 20  # précision des scores dans la clé de tri
+# Au-delà de cette part des noms, compter dans un tableau de taille N est plus rapide que trier les candidats
+DENSE_FRACTION = 0.1
+
+
+def normalize(text):
+    """Minuscules, sans accents ni ponctuation, espaces simples"""
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKD", text.replace("’", "'")).casefold()
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def trigrams(normalized):
+    """Trigrammes des mots, bordés d'espaces pour favoriser débuts et fins de mots"""
+    grams = set()
+    for word in normalized.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _prefix_range(sorted_keys, prefix):
+    """Bornes [lo, hi) des clés triées commençant par ``prefix``"""
+    lo = bisect_left(sorted_keys, prefix)
+    hi = bisect_left(sorted_keys, prefix + "￿", lo)
+    return lo, hi
+
+
+class NameIndex:
+    """Index trigrammes + préfixes sur une colonne de noms (positions 0..n-1)"""
+
+    def __init__(self, names):
+        self.names = [str(n) if isinstance(n, str) else "" for n in names]
+        self.size = len(self.names)
+        normalized = [normalize(n) for n in self.names]
+        self._exact = {}
+        for pos, key in enumerate(normalized):
+            self._exact.setdefault(key, []).append(pos)
+
+        postings = {}
+        words = []
+        for pos, key in enumerate(normalized):
+            for gram in trigrams(key):
+                postings.setdefault(gram, []).append(pos)
+            words.extend((word, pos) for word in set(key.split()))
+        self._postings = {gram: np.array(rows, dtype=np.intp) for gram, rows in postings.items()}
+
+        # Mots triés (un couple mot/ONG par entrée) : un préfixe = une tranche contiguë
+        words.sort()
+        self._words = [w for w, _ in words]
+        self._word_rows = np.array([pos for _, pos in words], dtype=np.int32)
+
+        # Noms complets triés, pour le bonus « le nom commence par la requête »
+        order = sorted(range(self.size), key=normalized.__getitem__)
+        self._sorted_names = [normalized[i] for i in order]
+        self._sorted_rows = np.array(order, dtype=np.int32)
+        # Départage : à score égal, les noms courts d'abord (longueur plafonnée pour tenir dans la clé de tri)
+        self._lengths = np.minimum([len(k) for k in normalized], 255).astype(np.int64)
+        self._position_bits = max(self.size, 1).bit_length()
+
+    def _dense_scores(self, word_slices, word_bonus, prefix_rows, exact_rows, lists, needed, n_grams):
+        """Cumul dans des tableaux de la taille de l'index (requête courante, beaucoup de candidats)"""
+        bonus = np.zeros(self.size, dtype=np.float32)
+        for rows in word_slices:
+            # Indexation avancée : une ONG présente deux fois dans la tranche ne reçoit le bonus qu'une fois
+            bonus[rows] += word_bonus
+        bonus[prefix_rows] += NAME_PREFIX_BONUS
+        bonus[exact_rows] += EXACT_BONUS
+        matched = bonus > 0
+        if lists:
+            shared = np.bincount(np.concatenate(lists), minlength=self.size)
+            similar = shared >= needed
+            matched |= similar
+        rows = np.flatnonzero(matched)
+        scores = bonus[rows]
+        if lists:
+            scores += np.where(similar[rows], shared[rows] / np.float32(n_grams), 0).astype(np.float32)
+        return rows, scores
+
+    def _sparse_scores(self, word_slices, word_bonus, prefix_rows, exact_rows, lists, needed, n_grams):
+        """Cumul sur les seuls candidats (requête rare) : tri des positions rencontrées"""
+        pieces = [np.unique(rows) for rows in word_slices] + [prefix_rows, np.asarray(exact_rows, dtype=np.int64)]
+        weights = [np.full(len(rows), word_bonus) for rows in word_slices]
+        weights += [np.full(len(prefix_rows), NAME_PREFIX_BONUS), np.full(len(exact_rows), EXACT_BONUS)]
+        if lists:
+            rows, shared = np.unique(np.concatenate(lists), return_counts=True)
+            similar = shared >= needed
+            pieces.append(rows[similar])
+            weights.append(shared[similar] / n_grams)
+        rows, inverse = np.unique(np.concatenate(pieces), return_inverse=True)
+        return rows, np.bincount(inverse, weights=np.concatenate(weights), minlength=len(rows)).astype(np.float32)
+
+    def scores(self, query):
+        """Positions des noms en rapport avec ``query`` et leur score (tableaux alignés, positions croissantes)"""
+        key = normalize(query)
+        if not key:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Bonus exacts (préfixes de mots, préfixe du nom, nom identique) : quelques tranches de tableaux
+        words = key.split()
+        word_slices = [self._word_rows[slice(*_prefix_range(self._words, word))] for word in words]
+        prefix_rows = self._sorted_rows[slice(*_prefix_range(self._sorted_names, key))]
+        exact_rows = self._exact.get(key, [])
+
+        # Similarité approchée : part des trigrammes de la requête présents dans le nom
+        grams = trigrams(key)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        needed = np.ceil(MIN_SIMILARITY * len(grams))
+
+        candidates = sum(map(len, word_slices)) + len(prefix_rows) + len(exact_rows) + sum(map(len, lists))
+        scorer = self._dense_scores if candidates > DENSE_FRACTION * self.size else self._sparse_scores
+        return scorer(word_slices, WORD_PREFIX_BONUS / len(words), prefix_rows, exact_rows, lists, needed, len(grams))
+
+    def _rank_keys(self, rows, scores):
+        """Clé de tri unique : score décroissant, puis nom le plus court, puis position"""
+        keys = -np.round(scores.astype(np.float64) * SCORE_SCALE).astype(np.int64)
+        keys = (keys << 8) | self._lengths[rows]
+        return (keys << self._position_bits) | rows
+
+    def search(self, query, limit=None):
+        """Positions des noms correspondant à ``query``, les plus pertinents d'abord"""
+        rows, scores = self.scores(query)
+        keys = self._rank_keys(rows, scores)
+        if limit is not None and len(rows) > limit:
+            top = np.argpartition(keys, limit - 1)[:limit]
+            rows, keys = rows[top], keys[top]
+        return rows[np.argsort(keys)]
+
+    def suggest(self, query, limit=5):
+        """Noms distincts proposés pendant la saisie"""
+        names = dict.fromkeys(self.names[i] for i in self.search(query, limit * 3))
+        return list(names)[:limit]
@@ -0,0 +1,117 @@
+"""Actualités humanitaires ReliefWeb, récupérées par lots en arrière-plan.
+
+Un lot de rapports est enregistré dans ``data/news_cache.json`` et partagé par
+toutes les sessions (et tous les processus). La page d'accueil lit toujours ce
+cache : s'il est périmé, un thread le rafraîchit en arrière-plan pendant que
+l'ancien lot reste affiché (stale-while-revalidate). Si l'API est en panne, le
+dernier lot valide continue d'être servi.
+"""
+
+import os
+import re
+import threading
+import time
+
+import requests
+
+import http_client
+from fileutils import DATA_DIR, file_version, read_json, write_json_atomic
+
+NEWS_PATH = os.path.join(DATA_DIR, "news_cache.json")
+RELIEFWEB_URL = os.environ.get("ONGAPP_RELIEFWEB_URL", "https://api.reliefweb.int/v1/reports")
+BATCH_SIZE = 20
+MAX_AGE = 15 * 60  # un lot plus vieux que 15 min est rafraîchi
+RETRY_DELAY = 60  # délai minimal entre deux tentatives après un échec
+BODY_LENGTH = 800
+
+
+def parse_report(fields):
+    """Prépare un rapport pour l'affichage (HTML retiré une fois pour toutes)"""
+    body_text = re.sub('<[^<]+?>', '', fields.get("body-html", ""))
+    return {
+        "title": fields.get("title", ""),
+        "date": (fields.get("date") or {}).get("created", "")[:10],
+        "sources": [s["name"] for s in fields.get("source", []) if "name" in s],
+        "body": body_text[:BODY_LENGTH],
+        "url": fields.get("url", ""),
+    }
+
+
+def fetch_reports(limit=BATCH_SIZE, url=RELIEFWEB_URL):
+    """Télécharge les ``limit`` rapports les plus récents"""
+    params = {"appname": "apidoc", "profile": "full", "limit": limit, "sort[]": "date:desc"}
+    response = http_client.get(url, params=params, endpoint="reliefweb.reports")
+    response.raise_for_status()
+    return [parse_report(item["fields"]) for item in response.json()["data"]]
+
+
+class NewsFeed:
+    """Lot d'actualités partagé, rafraîchi par un thread de fond"""
+
+    def __init__(self, path=NEWS_PATH, max_age=MAX_AGE, fetch=fetch_reports):
+        self.path = path
+        self.max_age = max_age
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._thread = None
+        self._version = None
+        self._batch = {"fetched_at": 0, "reports": []}
+        self._last_attempt = 0.0
+        self.last_error = None
+
+    def _load_from_disk(self):
+        """Relit le cache disque s'il a été modifié (par ce processus ou un autre)"""
+        version = file_version(self.path)
+        if version is not None and version != self._version:
+            batch = read_json(self.path)
+            if batch and batch.get("reports"):
+                self._batch = batch
+            self._version = version
+
+    def _refresh(self):
+        try:
+            reports = self._fetch()
+            if reports:
+                batch = {"fetched_at": time.time(), "reports": reports}
+                write_json_atomic(self.path, batch)
+                with self._lock:
+                    self._batch = batch
+                    self._version = file_version(self.path)
+            self.last_error = None
+        except (requests.RequestException, ValueError, LookupError) as e:
+            # On garde le dernier lot valide
+            self.last_error = str(e)
+
+    def refresh_async(self):
+        """Lance un rafraîchissement en arrière-plan (sans effet s'il y en a déjà un)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._thread
+            self._last_attempt = time.monotonic()
+            self._thread = threading.Thread(target=self._refresh, name="reliefweb-refresh", daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def reports(self, wait=5.0):
+        """Rapports du dernier lot ; déclenche un rafraîchissement si le lot est périmé.
+
+        Au tout premier lancement (aucun lot en cache), on attend au plus ``wait``
+        secondes que le premier téléchargement aboutisse.
+        """
+        with self._lock:
+            self._load_from_disk()
+            batch = self._batch
+        age = time.time() - batch.get("fetched_at", 0)
+        can_retry = not self._last_attempt or time.monotonic() - self._last_attempt > RETRY_DELAY
+        if age > self.max_age and can_retry:
+            thread = self.refresh_async()
+            if not batch["reports"] and wait:
+                thread.join(wait)
+                batch = self._batch
+        return batch["reports"]
+
+
+if __name__ == "__main__":
+    feed = NewsFeed(max_age=0)
+    feed.refresh_async().join()
+    print(f"{len(feed.reports(wait=0))} rapports -> {NEWS_PATH}" if not feed.last_error else f"Erreur : {feed.last_error}")
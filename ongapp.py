@@ -1,14 +1,21 @@
+import sqlite3
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-import folium 
+from streamlit.errors import StreamlitAPIException
 from streamlit_folium import st_folium
 import plotly.express as px
 import requests
-import re
 
-# --- Initialisation du stockage de l’historique ---
-if "historique_dons" not in st.session_state:
-    st.session_state["historique_dons"] = []
+import countries
+import country_meta
+import dataset
+import http_client
+import ledger
+import map_assets
+import news
+import profiling
 
 def user_login():
     """Système simple et propre de connexion utilisateur avec vérification e-mail"""
@@ -41,136 +48,121 @@ def user_login():
 # FONCTIONS DE BASE
 # ---------------------------
 
-@st.cache_data
+@st.cache_resource(show_spinner=False)
+def get_dataset_manager(csv_path):
+    """Gestionnaire de la base des ONG partagé par toutes les sessions (rechargement à chaud)"""
+    return dataset.DatasetManager(csv_path)
+
+
+def load_dataset(csv_path):
+    """Instantané courant de la base des ONG et de ses index (jamais de relecture bloquante après le démarrage)"""
+    with profiling.section("load_data"):
+        return get_dataset_manager(csv_path).current()
+
+
 def load_data(csv_path):
     """Charge le fichier CSV des ONG"""
-    return pd.read_csv(csv_path, sep=";")
+    return load_dataset(csv_path).df
 
 
-def filter_data(df, country, domains, search_name):
+def filter_data(ds, country, domains, search_name):
     """Filtre les données selon pays d'intervention, domaine et recherche"""
-    filtered = df.copy()
+    rows = None
 
-    # 🔹 Filtrage par pays d'intervention
+    # 🔹 Filtrage par pays d'intervention (index inversé construit au chargement)
     if country != "Tous":
-        filtered = filtered[filtered["pays_intervention"].str.contains(country, case=False, na=False)]
+        rows = ds.rows_for_country(country)
+
+    # 🔹 Filtrage par nom d'association (index de recherche, résultats classés par pertinence)
+    if search_name:
+        matches = ds.search_rows(search_name)
+        rows = matches if rows is None else matches[np.isin(matches, rows)]
+
+    filtered = ds.df if rows is None else ds.df.iloc[rows]
 
     # 🔹 Filtrage par domaine
     if domains:
         filtered = filtered[filtered["domaine"].isin(domains)]
 
-    # 🔹 Filtrage par nom d'association
-    if search_name:
-        filtered = filtered[filtered["nom"].str.contains(search_name, case=False, na=False)]
-
     return filtered
 
 
-def create_map(df):
-    """Crée une carte Folium colorée selon l'IDH"""
-
-    # Dictionnaire IDH simplifié (ONU 2023)
-    idh_data = {
-        "Iceland": 0.972, "Norway": 0.970, "Switzerland": 0.970, "Denmark": 0.962, "Germany": 0.959, "Sweden": 0.959, "Australia": 0.958, "Hong Kong, China (SAR)": 0.955, "Netherlands": 0.955, "Belgium": 0.951, "Ireland": 0.949, "Finland": 0.948, "Singapore": 0.946, "United Kingdom": 0.946, "United Arab Emirates": 0.940, "Canada": 0.939, "Liechtenstein": 0.938, "New Zealand": 0.938, "United States of America": 0.938, "South Korea": 0.937, "Slovenia": 0.931, "Austria": 0.930, "Japan": 0.925, "Malta": 0.924, "Luxembourg": 0.922, "France": 0.920, "Israel": 0.919, "Spain": 0.918, "Czechia": 0.915, "Italy": 0.915, "San Marino": 0.915, "Andorra": 0.913, "Cyprus": 0.913, "Greece": 0.908, "Poland": 0.906, "Estonia": 0.905, "Saudi Arabia": 0.900, "Bahrain": 0.899, "Lithuania": 0.895, "Portugal": 0.890, "Croatia": 0.889, "Latvia": 0.889, "Qatar": 0.886, "Slovakia": 0.880, "Chile": 0.878, "Hungary": 0.870, "Argentina": 0.865, "Montenegro": 0.862, "Uruguay": 0.862, "Oman": 0.858, "Türkiye": 0.853, "Kuwait": 0.852, "Antigua and Barbuda": 0.851, "Seychelles": 0.848, "Bulgaria": 0.845, "Romania": 0.845, "Georgia": 0.844, "Saint Kitts and Nevis": 0.840, "Panama": 0.839, "Brunei": 0.837, "Kazakhstan": 0.837, "Costa Rica": 0.833, "Republic of Serbia": 0.833, "Russia": 0.832, "Belarus": 0.824, "Bahamas": 0.820, "Malaysia": 0.819, "Macedonia": 0.815, "Armenia": 0.811, "Barbados": 0.811, "Albania": 0.810, "Trinidad and Tobago": 0.807, "Mauritius": 0.806, "Bosnia and Herzegovina": 0.804, "Iran (Islamic Republic of)": 0.799, "Saint Vincent and the Grenadines": 0.798, "Thailand": 0.798, "China": 0.797, "Peru": 0.794, "Grenada": 0.791, "Azerbaijan": 0.789, "Mexico": 0.789, "Colombia": 0.788, "Brazil": 0.786, "Palau": 0.786, "Moldova": 0.785, "Ukraine": 0.779, "Ecuador": 0.777, "Dominican Republic": 0.776, "Guyana": 0.776, "Sri Lanka": 0.776, "Tonga": 0.769, "Maldives": 0.766, "Viet Nam": 0.766, "Turkmenistan": 0.764, "Algeria": 0.763, "Cuba": 0.762, "Dominica": 0.761, "Paraguay": 0.756, "Egypt": 0.754, "Jordan": 0.754, "Lebanon": 0.752, "Saint Lucia": 0.748, "Mongolia": 0.747, "Tunisia": 0.746, "Kosovo": 0.742, "South Africa": 0.741, "Uzbekistan": 0.740, "Bolivia": 0.733, "Gabon": 0.733, "Marshall Islands": 0.733, "Botswana": 0.731, "Fiji": 0.731, "Indonesia": 0.728, "Suriname": 0.722, "Belize": 0.721, "Libya": 0.721, "Jamaica": 0.720, "Kyrgyzstan": 0.720, "Philippines": 0.720, "Morocco": 0.710, "Venezuela (Bolivarian Republic of)": 0.709, "Samoa": 0.708, "Nicaragua": 0.706, "Nauru": 0.703, "Bhutan": 0.698, "Eswatini (Kingdom of)": 0.695, "Iraq": 0.695, "Tajikistan": 0.691, "Tuvalu": 0.689, "Bangladesh": 0.685, "India": 0.685, "El Salvador": 0.678, "Equatorial Guinea": 0.674, "Palestine, State of": 0.674, "Cabo Verde": 0.668, "Namibia": 0.665, "Guatemala": 0.662, "Republic of the Congo": 0.649, "Honduras": 0.645, "Kiribati": 0.644, "Sao Tome and Principe": 0.637, "Timor-Leste": 0.634, "Ghana": 0.628, "Kenya": 0.628, "Nepal": 0.622, "Vanuatu": 0.621, "Lao People's Democratic Republic": 0.617, "Angola": 0.616, "Micronesia (Federated States of)": 0.615, "Myanmar": 0.609, "Cambodia": 0.606, "Comoros": 0.603, "Zimbabwe": 0.598, "Zambia": 0.595, "Cameroon": 0.588, "Solomon Islands": 0.584, "Ivory Coast": 0.582, "Uganda": 0.582, "Rwanda": 0.578, "Papua New Guinea": 0.576, "Togo": 0.571, "Syrian Arab Republic": 0.564, "Mauritania": 0.563, "Nigeria": 0.560, "Tanzania (United Republic of)": 0.555, "Haiti": 0.554, "Lesotho": 0.550, "Pakistan": 0.544, "Senegal": 0.530, "Gambia": 0.524, "Congo (Democratic Republic of the)": 0.522, "Malawi": 0.517, "Benin": 0.515, "Guinea Bissau": 0.514, "Djibouti": 0.513, "Sudan": 0.511, "Liberia": 0.510, "Eritrea": 0.503, "Guinea": 0.500, "Ethiopia": 0.497, "Afghanistan": 0.496, "Mozambique": 0.493, "Madagascar": 0.487, "Yemen": 0.470, "Sierra Leone": 0.467, "Burkina Faso": 0.459, "Burundi": 0.439, "Mali": 0.419, "Niger": 0.419, "Chad": 0.416, "Central African Republic": 0.414, "Somalia": 0.404, "South Sudan": 0.388
-    }
-
-    # Corrections de noms entre GeoJSON et IDH
-    name_corrections = {
-        "Czech Republic": "Czechia",
-        "Turkey": "Türkiye",
-        "Congo": "Republic of the Congo",
-        "Democratic Republic of the Congo": "Congo (Democratic Republic of the)",
-        "Palestine": "Palestine, State of",
-        "Tanzania": "Tanzania (United Republic of)",
-        "Vietnam": "Viet Nam",
-        "Swaziland": "Eswatini (Kingdom of)",
-        "Iran": "Iran (Islamic Republic of)",
-        "Venezuela": "Venezuela (Bolivarian Republic of)",
-        "Laos": "Lao People's Democratic Republic",
-        "Syria": "Syrian Arab Republic",
-    }
-
-    # Charger le GeoJSON mondial
-    url = "https://raw.githubusercontent.com/python-visualization/folium/main/examples/data/world-countries.json"
-    geojson_data = requests.get(url).json()
-
-    # Étendre le dictionnaire IDH pour inclure les deux versions (originale + corrigée)
-    idh_full = idh_data.copy()
-    for wrong, correct in name_corrections.items():
-        if correct in idh_data:
-            idh_full[wrong] = idh_data[correct]
-
-    # Carte moderne
-    m = folium.Map(location=[20, 0], zoom_start=2.3, tiles="CartoDB Voyager")
-
-    # Supprimer le contour bleu
-    m.get_root().html.add_child(folium.Element("""
-        <style>
-            path:focus { outline: none !important; }
-        </style>
-    """))
-
-    # Couleur selon IDH
-    def style_function(feature):
-        country = feature["properties"]["name"]
-        country = name_corrections.get(country, country)
-        idh = idh_data.get(country)
-        if idh is None:
-            color = "#e0e0e0"
-        elif idh >= 0.9:
-            color = "#2c7bb6"
-        elif idh >= 0.8:
-            color = "#abd9e9"
-        elif idh >= 0.7:
-            color = "#ffffbf"
-        elif idh >= 0.6:
-            color = "#fdae61"
-        else:
-            color = "#d7191c"
-        return {"fillColor": color, "color": "#555", "weight": 0.4, "fillOpacity": 0.8}
+@st.cache_resource(show_spinner=False)
+def get_country_meta_store():
+    """Métadonnées pays partagées par toutes les sessions, créées une fois.
+
+    Pas de clé de version : le store réécrit lui-même l'instantané à chaque pays
+    obtenu en direct et met à jour sa copie en mémoire, caches compris.
+    """
+    return country_meta.CountryMetaStore()
+
+
+def create_map(df, zoom=None):
+    """Crée une carte Folium colorée selon l'IDH (construite une fois, partagée entre sessions).
+
+    La géométrie servie est le plus petit niveau de détail suffisant pour ``zoom``.
+    Sans copie locale du GeoJSON et sans réseau, retourne None (nouvel essai au rerun suivant).
+    """
+    with profiling.section("create_map"):
+        try:
+            map_assets.ensure_world_geojson()
+        except (requests.RequestException, OSError):
+            return None
+        profiling.count("cache.idh_map.lookup")
+        return get_idh_map(map_assets.assets_version(), map_assets.level_for_zoom(zoom))
 
-    highlight = lambda _: {"fillColor": "#ffcc66", "color": "#333", "weight": 1, "fillOpacity": 0.9}
 
-    for feature in geojson_data["features"]:
-        folium.GeoJson(
-            feature,
-            style_function=style_function,
-            highlight_function=highlight,
-            tooltip=folium.GeoJsonTooltip(fields=["name"], aliases=["Pays :"])
-        ).add_to(m)
+@st.cache_resource(show_spinner=False, max_entries=6)
+@profiling.track_cache("styled_geojson")
+def get_styled_geojson(assets_version, level):
+    """GeoJSON mondial (au niveau de détail demandé) avec la couleur IDH de chaque pays"""
+    return map_assets.styled_geojson(map_assets.load_geojson_level(level))
 
-    return m
+
+@st.cache_resource(show_spinner=False, max_entries=6)
+@profiling.track_cache("idh_map")
+def get_idh_map(assets_version, level):
+    """Carte IDH en une seule couche ; reconstruite seulement si le GeoJSON ou la table IDH change"""
+    profiling.count("cache.styled_geojson.lookup")
+    return map_assets.build_idh_map(get_styled_geojson(assets_version, level), single_layer=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+@profiling.track_cache("hq_cells")
+def get_hq_cells(dataset_version, domains, _ds):
+    """Sièges regroupés par cellule, pour la sélection de domaines (tuple trié, vide = tous)"""
+    if not domains:
+        return map_assets.hq_cells(_ds.df)
+    rows = np.sort(np.concatenate([_ds.facets.domain_rows.get(d, np.empty(0, dtype=np.intp)) for d in domains]))
+    return map_assets.hq_cells(_ds.df.iloc[rows])
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+@profiling.track_cache("hq_layer")
+def get_hq_layer(dataset_version, domains, _ds):
+    """Couche des sièges partagée entre les sessions (``st_folium`` la modifie : rendu sous ``RENDER_LOCK``)"""
+    return map_assets.build_hq_layer(get_hq_cells(dataset_version, domains, _ds))
 
 
 # ---------------------------
 # THÉMATIQUES ONG
 # ---------------------------
 
-def show_theme_analysis(df):
+def show_theme_analysis(ds):
     st.subheader("Associations par thématique")
-    themes = sorted(df["domaine"].dropna().unique())
-    selected_theme = st.selectbox("Choisissez un thème :", themes)
+    theme_labels = ds.facets.domain_labels_with_counts()
+    selected_theme = st.selectbox("Choisissez un thème :", ds.domains, format_func=theme_labels.get)
 
-    theme_df = df[df["domaine"] == selected_theme]
+    theme_df = ds.df.iloc[ds.facets.domain_rows.get(selected_theme, [])]
     st.markdown(f"### {len(theme_df)} associations dans le domaine **{selected_theme}**")
 
-    for _, row in theme_df.iterrows():
-        lien_don = row.get("liens_dons", "")
-        bouton_don = f"[🤲 Faire un don]({lien_don})" if isinstance(lien_don, str) and lien_don.strip() != "" else ""
-        
-        st.markdown(f"""
-        **{row['nom']}**  
-        *{row['pays']}*  
-        **Domaine :** {row['domaine']}  
-        [🌐 Site officiel]({row['site_web']}) {bouton_don}
-        ---
-        """)
+    show_ngo_list(theme_df, key="theme", reset_on=selected_theme)
 
 # ---------------------------
 # PAGE DE DONS
 # ---------------------------
 
-def donation_page(df):
+def donation_page(ds):
     st.subheader("Faire un don à une association")
 
     # Vérifier si l'utilisateur est connecté
@@ -179,13 +171,12 @@ def donation_page(df):
         st.warning("Veuillez vous connecter dans la barre latérale avant de faire un don.")
         return
 
-    # Sélection de l'association
-    ong_names = sorted(df["nom"].dropna().astype(str).unique())
-    selected_ong = st.selectbox("Choisissez une association :", ong_names, key="select_ong")
+    # Sélection de l'association (liste triée une fois par version de la base)
+    selected_ong = st.selectbox("Choisissez une association :", ds.donation_names, key="select_ong")
 
     # Récupération des infos
-    ong_info = df[df["nom"] == selected_ong].iloc[0]
-    lien_don = str(ong_info.get("liens_dons") or ong_info.get("lien_don") or "").strip()
+    ong_info = ds.df.iloc[ds.name_rows[selected_ong]]
+    lien_don = str(ong_info.get("lien_don") or "").strip()
 
     # Affichage des infos de l'ONG
     st.markdown(f"""
@@ -194,6 +185,8 @@ def donation_page(df):
     **Site officiel :** [🌐 Voir le site officiel]({ong_info['site_web']})  
     """)
 
+    show_similar_ngos(ds, selected_ong)
+
     st.divider()
 
     # Formulaire
@@ -202,17 +195,17 @@ def donation_page(df):
     methode = st.selectbox("Méthode de paiement :", ["Carte bancaire", "PayPal", "Apple Pay"])
 
     if st.button("Payer"):
-        st.success(f"Merci {user} 🙏 Vous avez choisi de donner **{montant} €** à **{selected_ong}** via **{methode}**.")
+        # Enregistrement dans le registre des dons (conservé d'une session à l'autre), avant toute confirmation
+        try:
+            get_ledger().record(user, selected_ong, ong_info["pays"], ong_info["domaine"], montant, methode)
+        except ledger.DonationPendingError:
+            st.warning("Votre don est en cours d'enregistrement : vérifiez « Mes dons » dans un instant avant de le refaire.")
+            return
+        except (TimeoutError, sqlite3.Error) as e:
+            st.error(f"Votre don n'a pas pu être enregistré, merci de réessayer dans un instant. ({e})")
+            return
 
-        # Enregistrement dans l'historique
-        st.session_state["historique_dons"].append({
-            "utilisateur": user,
-            "association": selected_ong,
-            "pays": ong_info["pays"],
-            "domaine": ong_info["domaine"],
-            "montant": montant,
-            "methode_de_paiement": methode
-        })
+        st.success(f"Merci {user} 🙏 Vous avez choisi de donner **{montant} €** à **{selected_ong}** via **{methode}**.")
 
         # Lien de don officiel
         if lien_don:
@@ -225,43 +218,131 @@ def donation_page(df):
             st.warning("Cette association n’a pas encore de lien de don disponible.")
 
 
+SIMILAR_SHOWN = 5
+
+
+def show_similar_ngos(ds, selected_ong):
+    """Associations du même domaine intervenant dans les mêmes pays (rien tant que l'index n'est pas prêt)"""
+    suggestions, vus = [], {selected_ong}
+    for row in ds.similar_rows(ds.name_rows[selected_ong]).tolist():
+        nom = ds.names.names[row]
+        if nom and nom not in vus:
+            vus.add(nom)
+            suggestions.append(row)
+    if not suggestions:
+        return
+    with st.expander("🤝 Associations similaires"):
+        chunk = ds.df.iloc[suggestions[:SIMILAR_SHOWN]]
+        st.markdown("\n\n---\n\n".join(ngo_entry(row) for row in chunk.itertuples(index=False)))
+
+
 # ---------------------------
 # HISTORIQUE DES DONS
 # ---------------------------
 
+HISTORY_ROWS = 200
+
+
+@st.cache_resource(show_spinner=False)
+def get_ledger():
+    """Registre des dons partagé par toutes les sessions du processus"""
+    return ledger.Ledger()
+
+
 def show_don_history():
     st.subheader("Historique de mes dons")
-    if "historique_dons" not in st.session_state or not st.session_state["historique_dons"]:
+    user = st.session_state.get("user_email")
+    registre = get_ledger()
+    nombre, total = registre.user_summary(user) if user else (0, 0.0)
+    if not nombre:
         st.info("Aucun don enregistré.")
         return
 
-    dons_df = pd.DataFrame(st.session_state["historique_dons"])
-    st.dataframe(dons_df)
-    st.metric("Total des dons", f"{dons_df['montant'].sum()} €")
+    # Totaux lus dans les agrégats : quelques lignes, quel que soit le nombre de dons
+    st.metric("Total des dons", f"{total:,.2f} €", help=f"{nombre} dons")
+    par_domaine = pd.DataFrame(registre.user_domain_totals(user))
+    fig = px.bar(par_domaine, x="domaine", y="montant", color="domaine", text_auto=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown(f"#### Derniers dons ({min(nombre, HISTORY_ROWS)} sur {nombre})")
+    st.dataframe(pd.DataFrame(registre.user_donations(user, limit=HISTORY_ROWS)), hide_index=True)
+
+# ---------------------------
+# TABLEAU DE BORD DES DONS
+# ---------------------------
+
+DIMENSIONS_TABLEAU = {
+    "Association": "association",
+    "Domaine": "domaine",
+    "Pays": "pays",
+    "Méthode de paiement": "methode",
+}
+PERIODES_TABLEAU = {"Par mois": ("mois", 730), "Par jour": ("jour", 90)}  # (période, historique en jours)
+TOP_VALEURS = 8
+
+
+def show_analytics():
+    """Dons de tous les utilisateurs, lus uniquement dans les agrégats par période"""
+    st.subheader("Tableau de bord des dons")
+    col_a, col_b = st.columns(2)
+    libelle = col_a.selectbox("Regrouper par", list(DIMENSIONS_TABLEAU))
+    periode, historique = PERIODES_TABLEAU[col_b.radio("Période", list(PERIODES_TABLEAU), horizontal=True)]
+
+    depuis = (pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=historique)).strftime("%Y-%m-%d")
+    agregats = pd.DataFrame(get_ledger().rollup(DIMENSIONS_TABLEAU[libelle], periode, since=depuis))
+    if agregats.empty:
+        st.info("Aucun don enregistré sur la période.")
+        return
+    agregats["valeur"] = agregats["valeur"].replace("", "Non renseigné")
 
-    fig = px.bar(dons_df, x="domaine", y="montant", color="domaine", text_auto=True)
+    totaux = agregats.groupby("valeur", as_index=False)[["nombre", "montant"]].sum().sort_values("montant", ascending=False)
+    col_1, col_2 = st.columns(2)
+    col_1.metric("Total des dons", f"{totaux['montant'].sum():,.2f} €")
+    col_2.metric("Nombre de dons", int(totaux["nombre"].sum()))
+
+    fig = px.bar(totaux.head(TOP_VALEURS), x="valeur", y="montant", color="valeur", text_auto=True,
+                 labels={"valeur": libelle, "montant": "Montant (€)"})
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Évolution dans le temps : les valeurs hors du top sont regroupées
+    top = set(totaux["valeur"].head(TOP_VALEURS))
+    agregats["valeur"] = agregats["valeur"].where(agregats["valeur"].isin(top), "Autres")
+    evolution = agregats.groupby(["debut", "valeur"], as_index=False)["montant"].sum()
+    fig = px.bar(evolution, x="debut", y="montant", color="valeur",
+                 labels={"debut": "Période", "valeur": libelle, "montant": "Montant (€)"})
     st.plotly_chart(fig, use_container_width=True)
 
+
 # ---------------------------
 # BARRE DE RECHERCHE
 # ---------------------------
 
-def search_bar(df):
+def search_bar(ds):
     """Affiche la barre de recherche horizontale et retourne les paramètres saisis"""
     st.markdown("### 🔍 Recherche d'associations")
 
     col_a, col_b, col_c, col_d = st.columns([2, 2, 2, 1])
 
+    # Effectifs croisés : les pays sont comptés dans les domaines choisis, et inversement
+    facets = ds.facets
+    chosen_domains = st.session_state.get("recherche_domaines", [])
+    country_labels = facets.country_labels_with_counts(chosen_domains)
+    country_labels["Tous"] = f"Tous ({facets.total_count(chosen_domains)})"
+
     with col_a:
-        countries = ["Tous"] + sorted(set(sum([p.split(";") for p in df["pays_intervention"].dropna()], [])))
-        countries = [c.strip() for c in countries if c.strip()]
-        selected_country = st.selectbox("🌍 Pays", countries)
+        country_options = ["Tous"] + ds.countries
+        selected_country = st.selectbox("🌍 Pays", country_options, format_func=country_labels.get, key="recherche_pays")
 
     with col_b:
         search_name = st.text_input("🔎 Nom de l'association")
+        if search_name:
+            suggestions = ds.names.suggest(search_name)
+            if suggestions:
+                st.caption("Suggestions : " + " · ".join(suggestions))
 
     with col_c:
-        selected_domains = st.multiselect("🎯 Domaine", sorted(df["domaine"].dropna().astype(str).unique()))
+        domain_labels = facets.domain_labels_with_counts(selected_country)
+        selected_domains = st.multiselect("🎯 Domaine", ds.domains, format_func=domain_labels.get, key="recherche_domaines")
 
     with col_d:
         search_button = st.button("Rechercher", use_container_width=True)
@@ -273,25 +354,83 @@ def search_bar(df):
 # AFFICHAGE DES RÉSULTATS
 # ---------------------------
 
-def show_search_results(df, country, domains, search_name):
+def show_search_results(ds, country, domains, search_name):
     """Affiche les résultats d'une recherche"""
-    filtered_df = filter_data(df, country, domains, search_name)
+    with profiling.section("filter_data"):
+        filtered_df = filter_data(ds, country, domains, search_name)
+    profiling.size("filter_data.lignes", len(filtered_df))
 
     st.markdown(f"### 🔸 {len(filtered_df)} ONG trouvées")
 
     if len(filtered_df) == 0:
         st.info("Aucune ONG ne correspond à votre recherche.")
     else:
-        for _, row in filtered_df.iterrows():
-            lien_don = row.get("liens_dons", "")
-            bouton_don = f"[🤲 Faire un don]({lien_don})" if isinstance(lien_don, str) and lien_don.strip() != "" else ""
-            
-            st.markdown(f"""
-            **{row['nom']}** — *{row['domaine']}*  
-            _{row['pays']}_  
-            [🌐 Site officiel]({row['site_web']}) {bouton_don}
-            ---
-            """)
+        # Nouvelle recherche -> retour à la première page
+        show_ngo_list(filtered_df, key="recherche", reset_on=(ds.version, country, tuple(domains), search_name))
+
+
+# ---------------------------
+# LISTES D'ONG PAGINÉES
+# ---------------------------
+
+RESULTS_PAGE_SIZE = 20
+
+
+def ngo_entry(row, show_country=True):
+    """Bloc Markdown d'une ONG : nom, domaine, pays, liens"""
+    lines = [f"**{row.nom}** — *{row.domaine}*"]
+    if show_country and isinstance(row.pays, str):
+        lines.append(f"_{row.pays}_")
+    liens = []
+    if row.site_web:
+        liens.append(f"[🌐 Site officiel]({row.site_web})")
+    if row.lien_don:
+        liens.append(f"[🤲 Faire un don]({row.lien_don})")
+    lines.append(" ".join(liens))
+    return "  \n".join(lines)
+
+
+def _change_page(key, step):
+    st.session_state[key] += step
+
+
+def show_ngo_list(df, key, page_size=RESULTS_PAGE_SIZE, show_country=True, reset_on=None):
+    """Liste d'ONG affichée page par page, dans l'ordre de ``df``.
+
+    Chaque page est un seul élément Markdown : le nombre d'éléments envoyés au
+    navigateur reste borné quel que soit le nombre de résultats. ``reset_on``
+    revient à la première page quand sa valeur change (nouvelle recherche).
+    """
+    page_key, reset_key = f"page_{key}", f"page_{key}_origine"
+    if st.session_state.get(reset_key) != reset_on:
+        st.session_state[reset_key] = reset_on
+        st.session_state[page_key] = 0
+
+    pages = max(1, -(-len(df) // page_size))
+    page = min(max(st.session_state.get(page_key, 0), 0), pages - 1)
+    st.session_state[page_key] = page
+
+    start = page * page_size
+    with profiling.section("render_list"):
+        chunk = df.iloc[start:start + page_size]
+        text = "\n\n---\n\n".join(ngo_entry(row, show_country) for row in chunk.itertuples(index=False))
+        st.markdown(text)
+    profiling.size("render_list.octets", len(text.encode()))
+
+    if pages > 1:
+        col_prev, col_info, col_next = st.columns([1, 3, 1])
+        col_prev.button("◀ Précédent", key=f"{page_key}_prec", disabled=page == 0,
+                        on_click=_change_page, args=(page_key, -1), use_container_width=True)
+        col_info.caption(f"Page {page + 1} / {pages} · ONG {start + 1}–{start + len(chunk)} sur {len(df)}")
+        col_next.button("Suivant ▶", key=f"{page_key}_suiv", disabled=page == pages - 1,
+                        on_click=_change_page, args=(page_key, 1), use_container_width=True)
+
+
+@st.cache_resource(show_spinner=False)
+def get_news_feed():
+    """Flux d'actualités partagé par toutes les sessions du processus"""
+    return news.NewsFeed()
+
 
 def show_login_page():
     """Page d'accueil stylisée avec connexion et actualité humanitaire"""
@@ -318,39 +457,29 @@ def show_login_page():
     st.markdown("<hr>", unsafe_allow_html=True)
     st.markdown("### 📰 Actualité humanitaire du jour")
 
-    # 🟦 Bouton de nouvelle actu
+    # 🟦 Bouton de nouvelle actu : simple changement d'index dans le lot en cache
     if st.button("🔁 Voir une autre actualité"):
-        # On change la seed de recherche pour forcer ReliefWeb à renvoyer un autre résultat
         st.session_state["reliefweb_offset"] = st.session_state.get("reliefweb_offset", 0) + 1
-        st.rerun()
 
-    # ⚙️ API ReliefWeb
-    try:
+    # ⚙️ Lot ReliefWeb partagé (rafraîchi en arrière-plan)
+    reports = get_news_feed().reports()
+    if reports:
         offset = st.session_state.get("reliefweb_offset", 0)
-        url = f"https://api.reliefweb.int/v1/reports?appname=apidoc&profile=full&limit=1&offset={offset}&sort[]=date:desc"
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            report = data["data"][0]["fields"]
-
-            # 📰 Mise en forme claire et encadrée
-            st.markdown("<div style='background-color:white;padding:20px 25px;border-radius:10px;box-shadow:0 2px 8px rgba(0,0,0,0.1);'>", unsafe_allow_html=True)
-
-            st.markdown(f"### {report['title']}")
-            st.write(f"**Date :** {report['date']['created'][:10]}")
-            st.write(f"**Source :** {', '.join([s['name'] for s in report['source']])}")
+        report = reports[offset % len(reports)]
 
-            body_text = re.sub('<[^<]+?>', '', report.get("body-html", ""))
-            st.markdown(body_text[:800] + "...", unsafe_allow_html=True)
-            st.markdown(f"[🔗 Lire l’article complet sur ReliefWeb]({report['url']})")
+        # 📰 Mise en forme claire et encadrée
+        st.markdown("<div style='background-color:white;padding:20px 25px;border-radius:10px;box-shadow:0 2px 8px rgba(0,0,0,0.1);'>", unsafe_allow_html=True)
 
-            st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(f"### {report['title']}")
+        st.write(f"**Date :** {report['date']}")
+        st.write(f"**Source :** {', '.join(report['sources'])}")
 
+        st.markdown(report["body"] + "...", unsafe_allow_html=True)
+        st.markdown(f"[🔗 Lire l’article complet sur ReliefWeb]({report['url']})")
 
-        else:
-            st.warning("Impossible de récupérer les dernières actualités pour le moment.")
-    except Exception as e:
-        st.error(f"Erreur API : {e}")
+        st.markdown("</div>", unsafe_allow_html=True)
+    else:
+        st.warning("Impossible de récupérer les dernières actualités pour le moment.")
 
     # 🎨 Style global
     st.markdown("""
@@ -370,156 +499,273 @@ def show_login_page():
 
 
 # ---------------------------
-# APPLICATION PRINCIPALE
+# CARTE INTERACTIVE
 # ---------------------------
 
-def main():
-    if not st.session_state.get("user_email"):
-        show_login_page()
-        return  # on quitte ici pour ne pas exécuter la suite tant que pas connecté
-    # 🔒 Si connecté, affichage du contenu principal
-    st.set_page_config(page_title="ONG Explorer 2.0", layout="wide")
-    st.title("🌍 ONG Explorer 2.0 — Vue d'ensemble des actions humanitaires mondiales")
+def show_map_tab(ds):
+    """Vue carte : barre de recherche, puis résultats de recherche ou carte IDH"""
+    # --- BARRE DE RECHERCHE ---
+    selected_country, selected_domains, search_name, search_button = search_bar(ds)
 
-    df = load_data("bdd_ong.csv")
-    user_login()
+    if search_button:
+        # Quand on clique sur "Rechercher" : les résultats restent affichés pendant la pagination
+        st.session_state["recherche_active"] = True
 
-    tabs = st.tabs([" Carte interactive", " Par thématique", " Faire un don", " Mes dons"])
+    if st.session_state.get("recherche_active"):
+        show_search_results(ds, selected_country, selected_domains, search_name)
 
-    # --- Onglet Carte interactive ---
-    with tabs[0]:
-        # --- BARRE DE RECHERCHE ---
-        selected_country, selected_domains, search_name, search_button = search_bar(df)
+        if st.button("↩️ Revenir à la carte"):
+            st.session_state["recherche_active"] = False
+            st.rerun()
+    else:
+        # --- Affichage par défaut : la carte ---
+        show_map_section(ds)
 
-        if search_button:
-            # Quand on clique sur "Rechercher"
-            filtered_df = filter_data(df, selected_country, selected_domains, search_name)
-            st.markdown(f"### 🔸 {len(filtered_df)} ONG trouvées")
 
-            if len(filtered_df) == 0:
-                st.info("Aucune ONG ne correspond à votre recherche.")
-            else:
-                for _, row in filtered_df.iterrows():
-                    st.markdown(f"""
-                    **{row['nom']}** — *{row['domaine']}*  
-                    _{row['pays']}_  
-                    [Site officiel]({row['site_web']})
-                    ---
-                    """)
-
-            if st.button("↩️ Revenir à la carte"):
+@st.fragment
+def show_map_section(ds):
+    """Carte IDH + panneau du pays cliqué.
+
+    Fragment Streamlit : un clic ou un zoom sur la carte ne relance que cette
+    section, pas le reste de l'application.
+    """
+    # Un rerun du fragment seul est mesuré comme une exécution à part
+    with profiling.run("Carte interactive (fragment)"):
+        _map_section(ds)
+
+
+def _map_section(ds):
+    st.subheader("Carte des ONG dans le monde")
+    col1, col2 = st.columns([2, 1])
+    vue = st.session_state.get("carte_vue", {})
+    m = create_map(ds.df, vue.get("zoom"))
+    if m is None:
+        st.warning("Impossible de charger le fond de carte pour le moment : la carte s'affichera au prochain essai.")
+        return
+
+    # Sièges des ONG, filtrés par les domaines choisis dans la barre de recherche
+    sieges = None
+    if st.toggle("📍 Afficher les sièges des ONG", value=True, key="carte_sieges"):
+        domaines = tuple(sorted(st.session_state.get("recherche_domaines", [])))
+        profiling.count("cache.hq_layer.lookup")
+        sieges = get_hq_layer(ds.version, domaines, ds)
+        profiling.size("sieges.cellules", len(get_hq_cells(ds.version, domaines, ds)))
+
+    with col1:
+        # La couche des sièges est ajoutée dynamiquement : changer de filtre ne recharge pas la carte.
+        # La carte est partagée entre les sessions : rendue par une session à la fois, puis remise en état.
+        with profiling.section("st_folium"), map_assets.RENDER_LOCK:
+            try:
+                map_data = st_folium(
+                    m, width=750, height=500, render=False,
+                    zoom=vue.get("zoom"), center=vue.get("center"),
+                    feature_group_to_add=sieges,
+                )
+            finally:
+                if sieges is not None:
+                    map_assets.detach_layer(m, sieges)
+
+    # Mémoriser la vue ; si le niveau de détail nécessaire change, on recharge la carte
+    if map_data and map_data.get("zoom") and map_data.get("center"):
+        nouvelle_vue = {
+            "zoom": map_data["zoom"],
+            "center": (map_data["center"]["lat"], map_data["center"]["lng"]),
+        }
+        st.session_state["carte_vue"] = nouvelle_vue
+        if map_assets.level_for_zoom(nouvelle_vue["zoom"]) != map_assets.level_for_zoom(vue.get("zoom")):
+            try:
+                st.rerun(scope="fragment")
+            except StreamlitAPIException:
+                # Pendant un rerun complet de l'application, scope="fragment" est refusé
                 st.rerun()
 
-        else:
-            # --- Affichage par défaut : la carte ---
-            st.subheader("Carte des ONG dans le monde")
-            col1, col2 = st.columns([2, 1])
-            m = create_map(df)
-
-            with col1:
-                map_data = st_folium(m, width=750, height=500)
-
-            # 💡 Légende IDH propre sous la carte
-            st.markdown("""
-            <div style="
-                background-color: white;
-                border: 1px solid #bbb;
-                border-radius: 8px;
-                padding: 10px 20px;
-                margin-top: 10px;
-                width: 720px;
-                font-size: 13px;
-                box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
-            ">
-            <b>Indice de Développement Humain (IDH)</b> — <i>Source : ONU 2023</i><br><br>
-            <div style="display: flex; flex-wrap: wrap; gap: 12px; align-items: center;">
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 25px; height: 15px; background-color: #2c7bb6; margin-right: 6px;"></div> Très élevé (≥ 0.9)
-                </div>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 25px; height: 15px; background-color: #abd9e9; margin-right: 6px;"></div> Élevé (0.8–0.9)
-                </div>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 25px; height: 15px; background-color: #ffffbf; margin-right: 6px;"></div> Moyen (0.7–0.8)
-                </div>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 25px; height: 15px; background-color: #fdae61; margin-right: 6px;"></div> Faible (0.6–0.7)
-                </div>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 25px; height: 15px; background-color: #d7191c; margin-right: 6px;"></div> Très faible (< 0.6)
-                </div>
-            </div>
-            </div>
-            """, unsafe_allow_html=True)
+    # 💡 Légende IDH propre sous la carte
+    st.markdown("""
+    <div style="
+        background-color: white;
+        border: 1px solid #bbb;
+        border-radius: 8px;
+        padding: 10px 20px;
+        margin-top: 10px;
+        width: 720px;
+        font-size: 13px;
+        box-shadow: 2px 2px 5px rgba(0,0,0,0.1);
+    ">
+    <b>Indice de Développement Humain (IDH)</b> — <i>Source : ONU 2023</i><br><br>
+    <div style="display: flex; flex-wrap: wrap; gap: 12px; align-items: center;">
+        <div style="display: flex; align-items: center;">
+            <div style="width: 25px; height: 15px; background-color: #2c7bb6; margin-right: 6px;"></div> Très élevé (≥ 0.9)
+        </div>
+        <div style="display: flex; align-items: center;">
+            <div style="width: 25px; height: 15px; background-color: #abd9e9; margin-right: 6px;"></div> Élevé (0.8–0.9)
+        </div>
+        <div style="display: flex; align-items: center;">
+            <div style="width: 25px; height: 15px; background-color: #ffffbf; margin-right: 6px;"></div> Moyen (0.7–0.8)
+        </div>
+        <div style="display: flex; align-items: center;">
+            <div style="width: 25px; height: 15px; background-color: #fdae61; margin-right: 6px;"></div> Faible (0.6–0.7)
+        </div>
+        <div style="display: flex; align-items: center;">
+            <div style="width: 25px; height: 15px; background-color: #d7191c; margin-right: 6px;"></div> Très faible (< 0.6)
+        </div>
+    </div>
+    </div>
+    """, unsafe_allow_html=True)
 
-            # --- Infos pays cliqué ---
-            with col2:
-                if map_data and map_data.get("last_active_drawing"):
-                    selected_country = map_data["last_active_drawing"]["properties"]["name"]
-                    st.markdown(f"### 🌍 {selected_country}")
-
-                    try:
-                        r = requests.get(f"https://restcountries.com/v3.1/name/{selected_country}?fullText=true")
-                        info = r.json()[0] if r.status_code == 200 else None
-                    except Exception:
-                        info = None
-
-                    if info:
-                        st.image(info["flags"]["png"], width=120)
-                        st.markdown(f"**Capitale :** {', '.join(info.get('capital', []))}")
-                        st.markdown(f"**Population :** {info.get('population', 'Inconnue'):,}")
-                        st.markdown(f"**Langues :** {', '.join(info.get('languages', {}).values())}")
-                    else:
-                        st.info("Aucune donnée disponible pour ce pays.")
-
-                    # --- ONG présentes dans le pays cliqué ---
-                    ong_list = df[df["pays_intervention"].str.contains(selected_country, case=False, na=False)]
-                    st.markdown("---")
-
-                    if len(ong_list) > 0:
-                        locales = ong_list[ong_list["pays"].str.lower() == selected_country.lower()]
-                        internationales = ong_list[ong_list["pays"].str.lower() != selected_country.lower()]
-
-                        st.write(f"### 🤝 ONG présentes : {len(ong_list)}")
-
-                        # --- ONG locales ---
-                        st.markdown("#### 🏠 ONG locales")
-                        if len(locales) > 0:
-                            for _, row in locales.iterrows():
-                                lien_don = row.get("liens_dons", "")
-                                bouton_don = f"[🤲 Faire un don]({lien_don})" if isinstance(lien_don, str) and lien_don.strip() != "" else ""
-                                st.markdown(f"**{row['nom']}** — *{row['domaine']}*  \n[🌐 Site officiel]({row['site_web']}) {bouton_don}")
-                        else:
-                            st.info("Aucune ONG locale recensée pour ce pays.")
-
-                        # --- ONG internationales ---
-                        st.markdown("#### 🌍 ONG internationales")
-                        if len(internationales) > 0:
-                            for _, row in internationales.iterrows():
-                                lien_don = row.get("liens_dons", "")
-                                bouton_don = f"[🤲 Faire un don]({lien_don})" if isinstance(lien_don, str) and lien_don.strip() != "" else ""
-                                st.markdown(f"**{row['nom']}** — *{row['domaine']}*  \n[🌐 Site officiel]({row['site_web']}) {bouton_don}")
-                        else:
-                            st.info("Aucune ONG internationale recensée pour ce pays.")
-
-                    else:
-                        st.info("Aucune ONG répertoriée pour ce pays.")
+    # --- Infos pays cliqué ---
+    with col2:
+        if map_data and map_data.get("last_active_drawing"):
+            props = map_data["last_active_drawing"]["properties"]
+            selected_country = props["name"]
+            iso3 = props.get("iso3") or countries.resolve(selected_country)
+            st.markdown(f"### 🌍 {selected_country}")
+
+            info = get_country_meta_store().get(iso3)
+
+            if info:
+                if info.get("flag"):
+                    st.image(info["flag"], width=120)
+                population = info.get("population")
+                st.markdown(f"**Capitale :** {', '.join(info['capital'])}")
+                st.markdown(f"**Population :** {f'{population:,}' if population is not None else 'Inconnue'}")
+                st.markdown(f"**Langues :** {', '.join(info['languages'])}")
+            else:
+                st.info("Aucune donnée disponible pour ce pays.")
 
+            # --- ONG présentes dans le pays cliqué ---
+            pays_cle = iso3 or selected_country
+            rows = ds.rows_for_country(pays_cle)
+            ong_list = ds.df.iloc[rows]
+            st.markdown("---")
+
+            if len(ong_list) > 0:
+                est_locale = ds.local_mask(rows, pays_cle)
+                locales = ong_list[est_locale]
+                internationales = ong_list[~est_locale]
+
+                st.write(f"### 🤝 ONG présentes : {len(ong_list)}")
+
+                # --- ONG locales ---
+                st.markdown("#### 🏠 ONG locales")
+                if len(locales) > 0:
+                    show_ngo_list(locales, key="ong_locales", show_country=False, reset_on=pays_cle)
+                else:
+                    st.info("Aucune ONG locale recensée pour ce pays.")
+
+                # --- ONG internationales ---
+                st.markdown("#### 🌍 ONG internationales")
+                if len(internationales) > 0:
+                    show_ngo_list(internationales, key="ong_internationales", show_country=False, reset_on=pays_cle)
                 else:
-                    st.info("Cliquez sur un pays pour afficher ses informations.")
+                    st.info("Aucune ONG internationale recensée pour ce pays.")
+
+            else:
+                st.info("Aucune ONG répertoriée pour ce pays.")
+
+        else:
+            st.info("Cliquez sur un pays pour afficher ses informations.")
+
+
+# ---------------------------
+# PANNEAU DE PERFORMANCES (ADMINISTRATEURS)
+# ---------------------------
+
+PROFILING_RUNS = 20
+
+
+def show_profiling_panel(ds):
+    """Mesures des dernières exécutions, visibles des seuls administrateurs (ONGAPP_ADMINS)"""
+    runs = profiling.recent_runs()
+    with st.sidebar.expander("🛠️ Performances", expanded=False):
+        st.caption(f"{len(runs)} exécutions mesurées · base v{ds.version}")
+        if profiling.server_error:
+            st.warning(f"Serveur de métriques indisponible ({profiling.server_error})")
+        if not runs:
+            return
+
+        st.markdown("**Temps par section (ms)**")
+        resume = pd.DataFrame.from_dict(profiling.section_summary(runs), orient="index")
+        st.dataframe(resume, use_container_width=True)
+
+        # Succès des caches : accès comptés au point d'appel, échecs dans la fonction en cache
+        compteurs = {}
+        for run in runs:
+            for nom, n in run["counters"].items():
+                compteurs[nom] = compteurs.get(nom, 0) + n
+        caches = sorted({nom.split(".")[1] for nom in compteurs if nom.startswith("cache.")})
+        if caches:
+            st.markdown("**Caches**")
+            st.dataframe(pd.DataFrame([
+                {
+                    "cache": nom,
+                    "accès": compteurs.get(f"cache.{nom}.lookup", 0),
+                    "échecs": compteurs.get(f"cache.{nom}.miss", 0),
+                }
+                for nom in caches
+            ]), hide_index=True, use_container_width=True)
+
+        st.markdown("**Dernières exécutions**")
+        st.dataframe(pd.DataFrame([
+            {"vue": run["label"], "total_ms": run["total_ms"], **run["sizes"]}
+            for run in reversed(runs[-PROFILING_RUNS:])
+        ]), hide_index=True, use_container_width=True)
+
+        appels = http_client.get_client().stats()
+        if appels["endpoints"]:
+            st.markdown("**Appels HTTP**")
+            st.dataframe(pd.DataFrame.from_dict(appels["endpoints"], orient="index"), use_container_width=True)
+
+        col_json, col_prom = st.columns(2)
+        col_json.download_button("JSON", profiling.to_json(), "ongapp_profil.json", "application/json")
+        col_prom.download_button("Prometheus", profiling.to_prometheus(), "ongapp_metrics.txt", "text/plain")
+
+
+# ---------------------------
+# APPLICATION PRINCIPALE
+# ---------------------------
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server():
+    """Serveur ``/metrics`` lancé une fois par processus, dès la première exécution du script"""
+    return profiling.start_metrics_server()
 
 
-    # --- Onglet Thématiques ---
-    with tabs[1]:
-        show_theme_analysis(df)
+def main():
+    if profiling.ENABLED:
+        start_metrics_server()
+    with profiling.run("Connexion"):
+        _main()
+
+
+def _main():
+    if not st.session_state.get("user_email"):
+        show_login_page()
+        return  # on quitte ici pour ne pas exécuter la suite tant que pas connecté
+    # 🔒 Si connecté, affichage du contenu principal
+    st.set_page_config(page_title="ONG Explorer 2.0", layout="wide")
+    st.title("🌍 ONG Explorer 2.0 — Vue d'ensemble des actions humanitaires mondiales")
 
-    # --- Onglet Don ---
-    with tabs[2]:
-        donation_page(df)
+    ds = load_dataset("bdd_ong.csv")
+    user_login()
 
-    # --- Onglet Historique ---
-    with tabs[3]:
+    # Navigation : seule la vue active est calculée à chaque rerun
+    vues = ["Carte interactive", "Par thématique", "Faire un don", "Mes dons", "Tableau de bord"]
+    vue_active = st.radio("Navigation", vues, horizontal=True, key="vue_active", label_visibility="collapsed")
+    profiling.set_label(vue_active)
+
+    if vue_active == "Carte interactive":
+        show_map_tab(ds)
+    elif vue_active == "Par thématique":
+        show_theme_analysis(ds)
+    elif vue_active == "Faire un don":
+        donation_page(ds)
+    elif vue_active == "Mes dons":
         show_don_history()
+    else:
+        show_analytics()
+
+    if profiling.ENABLED and profiling.is_admin(st.session_state.get("user_email")):
+        show_profiling_panel(ds)
 
 
 # ---------------------------
@@ -0,0 +1,258 @@
+"""Mesures légères des reruns : temps par section, accès aux caches, tailles envoyées.
+
+Activées par la variable d'environnement ``ONGAPP_PROFILE=1``. Désactivées,
+chaque point de mesure se réduit à un test de booléen (``section`` rend un
+gestionnaire de contexte vide partagé).
+
+Chaque exécution du script (ou d'un fragment) produit un enregistrement :
+
+    {"started_at", "label", "total_ms", "sections": {nom: ms},
+     "counters": {nom: n}, "sizes": {nom: octets}}
+
+Les derniers enregistrements sont gardés dans un tampon circulaire partagé
+par le processus, et des totaux cumulés alimentent l'export Prometheus
+(téléchargeable depuis le panneau d'administration, ou servi sur
+``/metrics`` si ``ONGAPP_METRICS_PORT`` est défini).
+"""
+
+import functools
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("ONGAPP_PROFILE", "").lower() in ("1", "true", "yes")
+ADMINS = {e.strip().lower() for e in os.environ.get("ONGAPP_ADMINS", "").split(",") if e.strip()}
+METRICS_PORT = int(os.environ.get("ONGAPP_METRICS_PORT", "0") or 0)
+RING_SIZE = 500
+
+_log = logging.getLogger(__name__)
+_NULL = nullcontext()
+_local = threading.local()
+_lock = threading.Lock()
+_runs = deque(maxlen=RING_SIZE)
+_totals = {"runs": 0, "sections": {}, "counters": {}, "sizes": {}}
+
+
+def is_admin(email):
+    return bool(email) and email.lower() in ADMINS
+
+
+def _current():
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def _run(label):
+    record = {"started_at": time.time(), "label": label, "sections": {}, "counters": {}, "sizes": {}}
+    _local.run = record
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["total_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        _local.run = None
+        _store(record)
+
+
+def run(label):
+    """Encadre une exécution du script ; sans effet si une exécution est déjà en cours sur ce thread"""
+    if not ENABLED or _current() is not None:
+        return _NULL
+    return _run(label)
+
+
+def set_label(label):
+    """Nomme l'exécution en cours (par exemple la vue affichée, connue en cours de route)"""
+    record = _current() if ENABLED else None
+    if record is not None:
+        record["label"] = label
+
+
+@contextmanager
+def _section(name, record):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        record["sections"][name] = round(record["sections"].get(name, 0.0) + elapsed, 3)
+
+
+def section(name):
+    """Chronomètre un bloc ; les passages multiples dans une même exécution s'additionnent"""
+    record = _current() if ENABLED else None
+    if record is None:
+        return _NULL
+    return _section(name, record)
+
+
+def record_ms(name, elapsed_ms):
+    """Ajoute une durée mesurée ailleurs (ex. appels HTTP) à l'exécution en cours"""
+    record = _current() if ENABLED else None
+    if record is not None:
+        record["sections"][name] = round(record["sections"].get(name, 0.0) + elapsed_ms, 3)
+
+
+def count(name, n=1):
+    record = _current() if ENABLED else None
+    if record is not None:
+        record["counters"][name] = record["counters"].get(name, 0) + n
+
+
+def size(name, nbytes):
+    """Taille (octets ou éléments) d'une donnée envoyée au navigateur pendant l'exécution"""
+    record = _current() if ENABLED else None
+    if record is not None:
+        record["sizes"][name] = record["sizes"].get(name, 0) + int(nbytes)
+
+
+def track_cache(name):
+    """Décorateur à placer sous ``@st.cache_resource`` : compte les appels qui recalculent.
+
+    Le nombre d'accès est compté par ``count(f"cache.{name}.lookup")`` au point
+    d'appel ; le corps de la fonction n'étant exécuté qu'en cas d'échec, la
+    différence donne le nombre de succès.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            count(f"cache.{name}.miss")
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _store(record):
+    with _lock:
+        _runs.append(record)
+        _totals["runs"] += 1
+        for kind in ("sections", "counters", "sizes"):
+            totals = _totals[kind]
+            for key, value in record[kind].items():
+                if kind == "sizes":
+                    totals[key] = value  # dernière valeur observée
+                elif kind == "sections":
+                    n, total = totals.get(key, (0, 0.0))
+                    totals[key] = (n + 1, total + value)
+                else:
+                    totals[key] = totals.get(key, 0) + value
+
+
+# ---------------------------
+# LECTURE ET EXPORT
+# ---------------------------
+
+def recent_runs(limit=None):
+    """Derniers enregistrements, du plus ancien au plus récent"""
+    with _lock:
+        runs = list(_runs)
+    return runs[-limit:] if limit else runs
+
+
+def section_summary(runs=None):
+    """``{section: {n, p50_ms, p95_ms, max_ms}}`` sur les enregistrements du tampon"""
+    samples = {}
+    for record in recent_runs() if runs is None else runs:
+        samples.setdefault("total", []).append(record["total_ms"])
+        for name, ms in record["sections"].items():
+            samples.setdefault(name, []).append(ms)
+    summary = {}
+    for name, values in sorted(samples.items()):
+        values.sort()
+        summary[name] = {
+            "n": len(values),
+            "p50_ms": round(statistics.median(values), 3),
+            "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return summary
+
+
+def to_json(limit=None):
+    return json.dumps(recent_runs(limit), ensure_ascii=False, indent=1)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus():
+    """Totaux cumulés depuis le démarrage du processus, au format texte Prometheus"""
+    with _lock:
+        runs = _totals["runs"]
+        sections = dict(_totals["sections"])
+        counters = dict(_totals["counters"])
+        sizes = dict(_totals["sizes"])
+
+    lines = [
+        "# HELP ongapp_runs_total Exécutions du script mesurées.",
+        "# TYPE ongapp_runs_total counter",
+        f"ongapp_runs_total {runs}",
+        "# HELP ongapp_section_milliseconds Temps passé par section.",
+        "# TYPE ongapp_section_milliseconds summary",
+    ]
+    for name, (n, total) in sorted(sections.items()):
+        lines.append(f'ongapp_section_milliseconds_sum{{section="{_escape(name)}"}} {total:.3f}')
+        lines.append(f'ongapp_section_milliseconds_count{{section="{_escape(name)}"}} {n}')
+    lines += ["# HELP ongapp_events_total Compteurs (accès et échecs de cache, rechargements...).",
+              "# TYPE ongapp_events_total counter"]
+    for name, value in sorted(counters.items()):
+        lines.append(f'ongapp_events_total{{event="{_escape(name)}"}} {value}')
+    lines += ["# HELP ongapp_payload_size Dernière taille observée des données envoyées.",
+              "# TYPE ongapp_payload_size gauge"]
+    for name, value in sorted(sizes.items()):
+        lines.append(f'ongapp_payload_size{{payload="{_escape(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_started = False
+server_error = None  # raison de l'échec du démarrage de ``/metrics`` (port déjà pris...)
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Sert ``/metrics`` dans un thread (une seule tentative par processus) ; sans effet si ``port`` vaut 0.
+
+    Si le port n'est pas disponible, l'erreur est journalisée et gardée dans
+    ``server_error`` : l'application continue sans serveur de métriques.
+    """
+    global _server, _server_started, server_error
+    with _lock:
+        if not _server_started and ENABLED and port:
+            _server_started = True
+            try:
+                _server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+            except OSError as e:
+                server_error = f"port {port} : {e}"
+                _log.warning("Serveur de métriques non démarré (%s)", server_error)
+            else:
+                threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
+
+
+def reset():
+    with _lock:
+        _runs.clear()
+        _totals.update({"runs": 0, "sections": {}, "counters": {}, "sizes": {}})
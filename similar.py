@@ -0,0 +1,144 @@
+"""Associations similaires : voisins de chaque ONG, calculés une fois par version de la base.
+
+Chaque ONG est décrite par un vecteur creux ``domaine + pays d'intervention``
+(matrice ONG x pays stockée en CSR : ``indptr`` / ``indices``), pondéré par la
+rareté du pays dans le domaine (IDF) ; la similarité est le cosinus de ces
+vecteurs. Les voisins proposés sont des ONG du même domaine.
+
+Comparer toutes les paires d'un domaine serait quadratique. Les candidats sont
+donc tirés des listes de pays : les ONG du domaine sont triées selon leurs pays
+les plus distinctifs (le plus rare, puis le suivant...), ce qui met côte à côte
+celles qui partagent ces pays, et chaque ONG n'est comparée qu'aux ``WINDOW``
+ONG qui l'entourent dans cet ordre. Le coût est linéaire en nombre d'ONG ; un
+domaine plus petit que la fenêtre est comparé en entier (résultat exact). Les
+``TOP_K`` meilleurs voisins de chaque ONG sont gardés : la page de dons n'a
+plus qu'à lire une ligne de ``neighbours``.
+
+Quand la base est rechargée, l'index précédent est passé au constructeur : les
+domaines dont les ONG (et leurs pays) n'ont pas changé reprennent leurs voisins
+sans recalcul ; seuls les domaines modifiés sont recalculés.
+"""
+
+import hashlib
+
+import numpy as np
+
+TOP_K = 10
+WINDOW = 512  # candidats examinés pour chaque ONG
+BLOCK_ROWS = 128  # ONG traitées à la fois (doit rester inférieur à WINDOW)
+SORT_COUNTRIES = 3  # pays distinctifs qui fixent l'ordre de parcours des candidats
+DOMAIN_WEIGHT = 1.0  # poids de la composante domaine (commune à tout le groupe)
+
+
+def country_lists(interventions, n_rows):
+    """Matrice creuse ONG x pays en CSR : (indptr, indices, clés des pays)"""
+    key = interventions["key"].astype("category")
+    names = key.cat.categories.astype(str).to_numpy(dtype=object)
+    rank = np.empty(len(names), dtype=np.int32)
+    rank[np.argsort(names)] = np.arange(len(names), dtype=np.int32)
+    codes, keys = np.sort(names), rank[key.cat.codes.to_numpy()]
+    rows = interventions["row"].to_numpy(dtype=np.int64)
+    order = np.lexsort((keys, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, keys[order].astype(np.int32), codes
+
+
+def gather(rows, indptr, indices):
+    """Lignes ``rows`` de la matrice creuse : (nombre de pays par ligne, pays mis bout à bout)"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return lengths, indices[offsets + np.arange(len(offsets))]
+
+
+def group_signature(rows, indptr, indices, codes):
+    """Empreinte des pays des ONG d'un groupe, dans l'ordre : égale si le groupe n'a pas changé"""
+    lengths, cols = gather(rows, indptr, indices)
+    present, local = np.unique(cols, return_inverse=True)
+    digest = hashlib.sha1("\x00".join(codes[present].tolist()).encode("utf-8"))
+    digest.update(lengths.tobytes())
+    digest.update(local.astype(np.int32).tobytes())
+    return digest.hexdigest()
+
+
+def group_neighbours(rows, indptr, indices, top_k=TOP_K, window=WINDOW):
+    """Voisins d'un groupe d'ONG : (positions locales, scores), ``-1`` quand il en manque"""
+    size = len(rows)
+    k = min(top_k, size - 1)
+    local = np.full((size, top_k), -1, dtype=np.int32)
+    scores = np.zeros((size, top_k), dtype=np.float32)
+    if k <= 0:
+        return local, scores
+
+    # Matrice creuse du groupe, colonnes restreintes aux pays présents, pondérées par l'IDF
+    lengths, cols = gather(rows, indptr, indices)
+    member = np.repeat(np.arange(size), lengths)
+    present, cols = np.unique(cols, return_inverse=True)
+    doc_freq = np.bincount(cols, minlength=len(present))
+    weights = (np.log(size / doc_freq) + 1.0).astype(np.float32)
+    norms = np.sqrt(DOMAIN_WEIGHT ** 2 + np.bincount(member, weights=weights[cols] ** 2, minlength=size))
+    local_indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=local_indptr[1:])
+
+    # Ordre de parcours : pays le plus distinctif (le moins fréquent du domaine), puis le suivant...
+    by_rarity = np.lexsort((cols, doc_freq[cols], member))
+    rank = np.arange(len(cols)) - local_indptr[member]
+    first = rank < SORT_COUNTRIES
+    keys = np.full((SORT_COUNTRIES, size), len(present), dtype=np.int64)
+    keys[rank[first], member[first]] = cols[by_rarity][first]
+    order = np.lexsort(keys[::-1])
+
+    def dense(ids):
+        counts, found = gather(ids, local_indptr, cols)
+        matrix = np.zeros((len(ids), len(present)), dtype=np.float32)
+        matrix[np.repeat(np.arange(len(ids)), counts), found] = weights[found]
+        return matrix
+
+    half = (window - BLOCK_ROWS) // 2
+    for start in range(0, size, BLOCK_ROWS):
+        queries = order[start:start + BLOCK_ROWS]
+        low = min(max(start - half, 0), max(size - window, 0))
+        candidates = order[low:low + window]
+        block = dense(queries) @ dense(candidates).T + DOMAIN_WEIGHT ** 2
+        block /= np.outer(norms[queries], norms[candidates])
+        block[queries[:, None] == candidates[None, :]] = -np.inf  # pas soi-même
+        best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        best = candidates[best]
+        # Meilleur score d'abord, puis ordre de la base à score égal
+        ranked = np.lexsort((best, -best_scores), axis=1)
+        local[queries, :k] = np.take_along_axis(best, ranked, axis=1)
+        scores[queries, :k] = np.take_along_axis(best_scores, ranked, axis=1)
+    return local, scores
+
+
+class SimilarIndex:
+    """Voisins précalculés de chaque ONG (positions dans la table), partagés entre les sessions"""
+
+    def __init__(self, domain_rows, interventions, n_rows, previous=None, top_k=TOP_K):
+        self.top_k = top_k
+        indptr, indices, codes = country_lists(interventions, n_rows)
+        self.neighbours = np.full((n_rows, top_k), -1, dtype=np.int64)
+        self.scores = np.zeros((n_rows, top_k), dtype=np.float32)
+        self.groups = {}  # domaine -> (empreinte, positions locales, scores)
+        self.reused = 0
+
+        old_groups = previous.groups if previous is not None and previous.top_k == top_k else {}
+        for domain, rows in domain_rows.items():
+            signature = group_signature(rows, indptr, indices, codes)
+            old = old_groups.get(domain)
+            if old is not None and old[0] == signature:
+                self.groups[domain] = old
+                self.reused += 1
+            else:
+                self.groups[domain] = (signature, *group_neighbours(rows, indptr, indices, top_k))
+            _, local, scores = self.groups[domain]
+            self.neighbours[rows] = np.where(local >= 0, rows[np.maximum(local, 0)], -1)
+            self.scores[rows] = scores
+
+    def similar(self, row, limit=None):
+        """Positions des ONG les plus proches de ``row``, la plus proche d'abord"""
+        found = self.neighbours[row]
+        found = found[found >= 0]
+        return found[:limit] if limit else found
@@ -0,0 +1,76 @@
+"""Résolution des noms de pays : orthographes du CSV, de l'ONU et du GeoJSON vers ISO3."""
+
+import pytest
+
+import countries
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return countries.CountryResolver()
+
+
+@pytest.mark.parametrize("name, iso3", [
+    ("Niger", "NER"),
+    ("NIGER ", "NER"),
+    ("Nigeria", "NGA"),
+    ("nigéria", "NGA"),
+    ("Congo", "COG"),
+    ("Democratic Republic of the Congo", "COD"),
+    ("République démocratique du Congo", "COD"),
+])
+def test_close_names_stay_distinct(resolver, name, iso3):
+    assert resolver.resolve(name) == iso3
+
+
+@pytest.mark.parametrize("name", [
+    "Côte d'Ivoire",
+    "Côte d’Ivoire",  # apostrophe typographique
+    "Cote d'Ivoire",
+    "CÔTE D'IVOIRE",
+    "côte  d'ivoire",
+    "Ivory Coast",
+    "The Ivory Coast",
+    "CIV",
+])
+def test_cote_divoire_spellings(resolver, name):
+    assert resolver.resolve(name) == "CIV"
+
+
+@pytest.mark.parametrize("name", ["Atlantis", "", "   ", None, 3.5])
+def test_unknown_names(resolver, name):
+    assert resolver.resolve(name) is None
+
+
+def test_display_names(resolver):
+    assert resolver.name("CIV") == "Côte d'Ivoire"
+    assert resolver.name("CIV", lang="en") == "Ivory Coast"
+    assert resolver.name("XXX") == "XXX"
+
+
+def test_unresolved_report(resolver):
+    assert resolver.unresolved(["Niger", "Atlantis", "Atlantis", "", None, "Lemuria"]) == ["Atlantis", "Lemuria"]
+
+
+def test_default_table_has_no_ambiguous_alias():
+    # La construction vérifie chaque alias (exact et sans accents) : elle échouerait sur un doublon
+    resolver = countries.CountryResolver(countries.COUNTRIES)
+    assert len(resolver.names_fr) == len(countries.COUNTRIES)
+
+
+@pytest.mark.parametrize("aliases", [
+    ["Terre du Milieu"],  # même alias exact
+    ["terre-du-milieu"],  # même clé sans accents ni ponctuation
+])
+def test_ambiguous_alias_is_rejected(aliases):
+    table = [
+        ("AAA", "Terre du Milieu", "Middle-earth", []),
+        ("BBB", "Gondor", "Gondor", aliases),
+    ]
+    with pytest.raises(ValueError, match="Alias ambigu"):
+        countries.CountryResolver(table)
+
+
+def test_same_alias_for_the_same_country_is_allowed():
+    resolver = countries.CountryResolver([("AAA", "Terre", "Terre", ["terre", "TERRE"])])
+    assert resolver.resolve("Terre") == "AAA"
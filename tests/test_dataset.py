@@ -0,0 +1,130 @@
+"""Index inversé pays d'intervention -> ONG (``OngDataset.rows_for_country``)."""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset
+
+
+@pytest.fixture(scope="module")
+def table():
+    return pd.DataFrame({
+        "nom": ["Alpha", "Bêta", "Gamma", "Delta", "Epsilon"],
+        "pays": ["France", "Niger", "Nigeria", "France", "Sénégal"],
+        "domaine": ["Santé", "Eau", "Santé", "Éducation", None],
+        "latitude": [48.8, 13.5, 9.1, 45.7, 14.7],
+        "longitude": [2.3, 2.1, 7.4, 4.8, -17.4],
+        "site_web": ["https://a.org", "", None, "https://d.org", "https://e.org"],
+        "pays_intervention": [
+            "Niger; Nigeria",
+            "Niger;Niger;Mali",  # pays cité deux fois
+            "Nigeria;Côte d’Ivoire",
+            "Cote d'Ivoire; Atlantis",  # pays absent de la table
+            None,
+        ],
+    })
+
+
+@pytest.fixture(scope="module")
+def ds(table):
+    return dataset.OngDataset(dataset.validate_schema(table))
+
+
+@pytest.mark.parametrize("country, rows", [
+    ("Niger", [0, 1]),
+    ("NER", [0, 1]),
+    ("Nigeria", [0, 2]),
+    ("Nigéria", [0, 2]),
+    ("Mali", [1]),
+    ("Côte d'Ivoire", [2, 3]),
+    ("Ivory Coast", [2, 3]),
+    ("CIV", [2, 3]),
+    ("Atlantis", [3]),
+])
+def test_rows_for_country(ds, country, rows):
+    found = ds.rows_for_country(country)
+    assert found.tolist() == rows
+    assert found.dtype == np.int64
+
+
+@pytest.mark.parametrize("country", ["France", "Lemuria", "", None])
+def test_country_without_ngo(ds, country):
+    assert len(ds.rows_for_country(country)) == 0
+
+
+def test_ngos_in_country(ds):
+    assert ds.ngos_in_country("Nigeria")["nom"].tolist() == ["Alpha", "Gamma"]
+
+
+def test_index_matches_a_scan_of_the_column(ds):
+    expected = {}
+    for pos, value in enumerate(ds.df["pays_intervention"]):
+        for name in dataset.split_countries(value):
+            expected.setdefault(dataset.country_key(name), set()).add(pos)
+    assert {key: set(rows.tolist()) for key, rows in ds.country_index.items()} == expected
+
+
+def test_labels_use_the_display_name(ds):
+    assert ds.country_labels["CIV"] == "Côte d'Ivoire"
+    assert ds.country_labels["atlantis"] == "Atlantis"
+
+
+def test_same_index_from_the_arrow_files(ds, table, tmp_path):
+    csv_path = tmp_path / "bdd_ong.csv"
+    table.to_csv(csv_path, sep=";", index=False)
+    dataset.ingest(str(csv_path))
+    reloaded = dataset.OngDataset.from_csv(str(csv_path))
+    assert reloaded.country_index.keys() == ds.country_index.keys()
+    for key, rows in ds.country_index.items():
+        assert reloaded.rows_for_country(key).tolist() == rows.tolist()
+
+
+def test_concurrent_ingests_do_not_share_a_temporary_file(ds, table, tmp_path):
+    csv_path = tmp_path / "bdd_ong.csv"
+    table.to_csv(csv_path, sep=";", index=False)
+    errors = []
+
+    def run():
+        try:
+            dataset.ingest(str(csv_path))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    columnar_dir = os.path.dirname(dataset.columnar_paths(str(csv_path))[0])
+    assert not [name for name in os.listdir(columnar_dir) if name.endswith(".tmp")]
+    reloaded = dataset.OngDataset.from_csv(str(csv_path))
+    assert reloaded.country_index.keys() == ds.country_index.keys()
+
+
+def test_broken_csv_is_read_once_per_change(ds, table, tmp_path, monkeypatch):
+    csv_path = tmp_path / "bdd_ong.csv"
+    table.to_csv(csv_path, sep=";", index=False)
+    manager = dataset.DatasetManager(str(csv_path))
+    first = manager.current()
+
+    reads = []
+    content_hash = dataset.content_hash
+    monkeypatch.setattr(dataset, "content_hash", lambda path: reads.append(path) or content_hash(path))
+
+    table.drop(columns="nom").to_csv(csv_path, sep=";", index=False)
+    manager.check().join()
+    assert "nom" in manager.last_error
+    # Même fichier invalide : pas de nouvelle lecture, l'instantané précédent reste servi
+    assert manager.check() is None
+    assert manager.current() is first
+    assert len(reads) == 1
+
+    table.to_csv(csv_path, sep=";", index=False)
+    os.utime(csv_path, ns=(0, 0))  # nouvelle version du fichier, même si la taille et la date coïncidaient
+    manager.check().join()
+    assert manager.last_error is None and len(reads) == 2
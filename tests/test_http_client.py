@@ -0,0 +1,114 @@
+"""Client HTTP partagé contre le faux serveur de ``bench/mock_upstreams.py`` : nouvelles tentatives,
+délai global, disjoncteur (ouvert, semi-ouvert) et compteurs."""
+
+import importlib.util
+import os
+import time
+
+import pytest
+
+import http_client
+
+_spec = importlib.util.spec_from_file_location(
+    "mock_upstreams", os.path.join(os.path.dirname(os.path.dirname(__file__)), "bench", "mock_upstreams.py"))
+mock_upstreams = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(mock_upstreams)
+
+ALPHA = "/v3.1/alpha/FRA"
+
+
+@pytest.fixture
+def upstream():
+    server = mock_upstreams.serve(port=0)
+    mock_upstreams.MockHandler.hits.clear()
+    yield server
+    server.shutdown()
+    server.server_close()
+    recovered()
+
+
+def url(server, path=ALPHA):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def hits(path=ALPHA):
+    return mock_upstreams.MockHandler.hits.get(path, 0)
+
+
+def failing(status=503, latency=0.0):
+    mock_upstreams.MockHandler.fail_rate = 1.0
+    mock_upstreams.MockHandler.fail_status = status
+    mock_upstreams.MockHandler.latency = latency
+
+
+def recovered():
+    mock_upstreams.MockHandler.fail_rate = 0.0
+    mock_upstreams.MockHandler.fail_status = 503
+    mock_upstreams.MockHandler.latency = 0.0
+
+
+def client(**options):
+    return http_client.HttpClient(**{"retries": 2, "backoff": 0.01, "failure_threshold": 2, **options})
+
+
+def test_success_is_counted(upstream):
+    http = client()
+    response = http.get(url(upstream), endpoint="alpha")
+    assert response.status_code == 200 and response.json()[0]["cca3"] == "FRA"
+    stats = http.stats()
+    assert stats["endpoints"]["alpha"]["calls"] == 1 and stats["endpoints"]["alpha"]["errors"] == 0
+    assert set(stats["breakers"].values()) == {"closed"}
+
+
+@pytest.mark.parametrize("status", [503, 429])
+def test_failures_are_retried_then_open_the_breaker(upstream, status):
+    http = client()
+    failing(status)
+    for _ in range(2):
+        assert http.get(url(upstream), endpoint="alpha").status_code == status
+    assert hits() == 2 * 3  # première tentative + 2 nouvelles, par appel
+    assert http.stats()["endpoints"]["alpha"]["errors"] == 2
+
+    # Disjoncteur ouvert : échec immédiat, sans requête
+    with pytest.raises(http_client.CircuitOpenError):
+        http.get(url(upstream), endpoint="alpha")
+    assert hits() == 6
+    assert http.stats()["endpoints"]["alpha"]["rejected"] == 1
+    assert set(http.stats()["breakers"].values()) == {"open"}
+
+
+def test_half_open_breaker_lets_one_trial_through(upstream):
+    http = client(reset_after=0.2)
+    failing()
+    for _ in range(2):
+        http.get(url(upstream))
+    time.sleep(0.25)
+    assert set(http.stats()["breakers"].values()) == {"half-open"}
+
+    # Essai raté : le disjoncteur se rouvre aussitôt
+    http.get(url(upstream))
+    with pytest.raises(http_client.CircuitOpenError):
+        http.get(url(upstream))
+
+    # Essai réussi : refermé
+    time.sleep(0.25)
+    recovered()
+    assert http.get(url(upstream)).status_code == 200
+    assert set(http.stats()["breakers"].values()) == {"closed"}
+
+
+def test_deadline_bounds_retries(upstream):
+    http = client(retries=10, backoff=0.1, deadline=0.6)
+    failing(latency=0.2)
+    start = time.monotonic()
+    assert http.get(url(upstream)).status_code == 503
+    assert time.monotonic() - start < 1.0
+    assert 1 <= hits() < 4
+
+
+def test_timeout_is_a_failure(upstream):
+    http = client(retries=0, host_timeouts={"127.0.0.1": (1, 0.1)})
+    mock_upstreams.MockHandler.latency = 0.5
+    with pytest.raises(http_client.requests.Timeout):
+        http.get(url(upstream), endpoint="alpha")
+    assert http.stats()["endpoints"]["alpha"]["errors"] == 1
@@ -0,0 +1,225 @@
+"""Registre des dons : les agrégats tenus par les triggers doivent égaler les ``SUM()`` sur ``dons``."""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import ledger
+
+DONS = [
+    ("alice@exemple.fr", "Médecins du Monde", "France", "Santé", 25, "PayPal"),
+    ("alice@exemple.fr", "Oxfam", "Royaume-Uni", "Humanitaire", 10.5, "Carte bancaire"),
+    ("alice@exemple.fr", "Médecins du Monde", "France", "Santé", 0.1, "Apple Pay"),
+    ("bob@exemple.fr", "Oxfam", "Royaume-Uni", "Humanitaire", 100, "PayPal"),
+    ("bob@exemple.fr", "Sans pays", None, None, 3.33, None),
+]
+DATES = ["2026-01-31T23:59:59+00:00", "2026-02-01T00:00:00+00:00", "2026-02-15T12:00:00+00:00"]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "dons.sqlite3")
+
+
+@pytest.fixture
+def dated(monkeypatch):
+    """Horodatages fixes, répartis sur plusieurs jours et deux mois"""
+    dates = iter(DATES * 100)
+
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromisoformat(next(dates)).astimezone(tz or timezone.utc)
+
+    monkeypatch.setattr(ledger, "datetime", FixedDatetime)
+
+
+def rows(conn, sql):
+    return sorted(tuple(r) for r in conn.execute(sql).fetchall())
+
+
+def expected_rollups(conn):
+    return sorted(
+        (period, *r)
+        for period, length, dimension, column in ledger._ROLLUP_KEYS
+        for r in conn.execute(
+            f"SELECT substr(created_at, 1, {length}), '{dimension}', coalesce({column}, ''), "
+            f"count(*), sum(montant_cents) FROM dons GROUP BY 1, 3"
+        ).fetchall()
+    )
+
+
+def assert_aggregates_match(path):
+    conn = sqlite3.connect(path)
+    try:
+        assert rows(conn, "SELECT * FROM totaux_utilisateur") == rows(
+            conn, "SELECT user_email, count(*), sum(montant_cents) FROM dons GROUP BY 1")
+        assert rows(conn, "SELECT * FROM totaux_utilisateur_domaine") == rows(
+            conn, "SELECT user_email, domaine, count(*), sum(montant_cents) FROM dons GROUP BY 1, 2")
+        assert rows(conn, "SELECT * FROM totaux_domaine") == rows(
+            conn, "SELECT domaine, count(*), sum(montant_cents) FROM dons GROUP BY 1")
+        assert rows(conn, "SELECT * FROM agregats_periode") == expected_rollups(conn)
+    finally:
+        conn.close()
+
+
+def test_totals_match_sum(path, dated):
+    registre = ledger.Ledger(path)
+    for don in DONS:
+        registre.record(*don)
+
+    assert_aggregates_match(path)
+    assert registre.user_summary("alice@exemple.fr") == (3, 35.6)
+    assert registre.user_summary("inconnu@exemple.fr") == (0, 0.0)
+    assert registre.user_domain_totals("bob@exemple.fr") == [
+        {"domaine": "Humanitaire", "nombre": 1, "montant": 100.0},
+        {"domaine": "", "nombre": 1, "montant": 3.33},
+    ]
+    mois = registre.rollup("domaine", "mois")
+    assert {(r["debut"], r["valeur"]): r["montant"] for r in mois} == {
+        ("2026-01", "Santé"): 25.0,
+        ("2026-01", "Humanitaire"): 100.0,
+        ("2026-02", "Humanitaire"): 10.5,
+        ("2026-02", "Santé"): 0.1,
+        ("2026-02", ""): 3.33,
+    }
+    assert [r["debut"] for r in registre.rollup("pays", "jour", since="2026-02-15")] == ["2026-02-15"]
+
+
+def test_amounts_are_exact_cents(path):
+    registre = ledger.Ledger(path)
+    for _ in range(10):
+        registre.record("alice@exemple.fr", "Oxfam", "France", "Santé", 0.1, "PayPal")
+    assert registre.user_summary("alice@exemple.fr") == (10, 1.0)
+
+
+def test_backfill_of_an_older_database(path, dated):
+    registre = ledger.Ledger(path)
+    for don in DONS:
+        registre.record(*don)
+
+    # Base créée avant les agrégats par période
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TRIGGER dons_agregats_periode; DROP TABLE agregats_periode;")
+    conn.close()
+
+    ledger.Ledger(path)
+    assert_aggregates_match(path)
+
+
+def test_reopening_keeps_rollups(path, dated):
+    registre = ledger.Ledger(path)
+    for don in DONS:
+        registre.record(*don)
+    reopened = ledger.Ledger(path)
+    reopened.record(*DONS[0])
+    assert_aggregates_match(path)
+    assert reopened.user_summary("alice@exemple.fr") == (4, 60.6)
+
+
+def test_concurrent_records_are_batched(path):
+    registre = ledger.Ledger(path, batch_size=7)
+    done = []
+
+    def session(n):
+        for i in range(25):
+            done.append(registre.record(f"user{n}@exemple.fr", "Oxfam", "France", "Santé", i + 1, "PayPal", wait=0))
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(event.wait(10) for event in done)
+
+    assert_aggregates_match(path)
+    for n in range(8):
+        assert registre.user_summary(f"user{n}@exemple.fr") == (25, 325.0)
+
+
+def test_failed_batch_does_not_stop_the_writer(path):
+    registre = ledger.Ledger(path)
+
+    class Unstorable:
+        def __conform__(self, protocol):
+            raise RuntimeError("valeur non enregistrable")
+
+    with pytest.raises(RuntimeError):
+        registre.record("alice@exemple.fr", "Oxfam", "France", "Santé", 5, Unstorable())
+    with pytest.raises(sqlite3.IntegrityError):
+        registre.record("alice@exemple.fr", "Oxfam", "France", "Santé", 0, "PayPal")
+
+    registre.record("alice@exemple.fr", "Oxfam", "France", "Santé", 5, "PayPal")
+    assert registre.user_summary("alice@exemple.fr") == (1, 5.0)
+    assert_aggregates_match(path)
+
+
+def count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT count(*) FROM dons").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def registre(path):
+    return ledger.Ledger(path)
+
+
+@pytest.fixture
+def locked(path, registre):
+    """Base verrouillée en écriture par une autre connexion : le thread d'écriture attend"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("BEGIN IMMEDIATE")
+    yield conn
+    if conn.in_transaction:
+        conn.execute("ROLLBACK")
+    conn.close()
+
+
+def test_timed_out_donation_is_never_written(path, registre, locked):
+    # Pris par le thread d'écriture (bloqué sur le verrou) : en cours, à ne pas refaire
+    with pytest.raises(ledger.DonationPendingError):
+        registre.record("alice@exemple.fr", "Oxfam", "France", "Santé", 5, "PayPal", wait=0.5)
+    # Encore dans la file : abandonné, le refaire ne crée pas de doublon
+    with pytest.raises(TimeoutError) as raised:
+        registre.record("bob@exemple.fr", "Oxfam", "France", "Santé", 7, "PayPal", wait=0.5)
+    assert not isinstance(raised.value, ledger.DonationPendingError)
+
+    locked.execute("ROLLBACK")
+    registre.record("bob@exemple.fr", "Oxfam", "France", "Santé", 7, "PayPal")
+    assert registre.user_summary("alice@exemple.fr") == (1, 5.0)
+    assert registre.user_summary("bob@exemple.fr") == (1, 7.0)
+    assert count(path) == 2
+
+
+def test_bad_donation_does_not_fail_its_batch(path, registre, locked):
+    errors = {}
+
+    def session(user, montant):
+        try:
+            registre.record(user, "Oxfam", "France", "Santé", montant, "PayPal", wait=20)
+        except Exception as e:
+            errors[user] = e
+
+    # Le premier don occupe le thread d'écriture ; les trois suivants forment un même lot
+    first = threading.Thread(target=session, args=("premier@exemple.fr", 1))
+    first.start()
+    time.sleep(0.3)
+    batch = [threading.Thread(target=session, args=(f"user{i}@exemple.fr", montant))
+             for i, montant in enumerate([2, 0, 3])]
+    for t in batch:
+        t.start()
+    time.sleep(0.3)
+    locked.execute("ROLLBACK")
+    for t in [first, *batch]:
+        t.join()
+
+    assert list(errors) == ["user1@exemple.fr"]
+    assert isinstance(errors["user1@exemple.fr"], sqlite3.IntegrityError)
+    assert count(path) == 3
+    assert_aggregates_match(path)
@@ -0,0 +1,130 @@
+"""Couches de carte rendues une seule fois (``StaticGeoJson``, ``StaticFastMarkerCluster``).
+
+Le rendu mis en cache doit envoyer au navigateur exactement ce qu'envoie une
+carte folium ordinaire, rerun après rerun. Les identifiants d'éléments sont
+aléatoires : ils sont renumérotés dans l'ordre d'apparition avant la comparaison.
+"""
+
+import gc
+import re
+import weakref
+
+import folium
+import streamlit_folium
+from folium.plugins import FastMarkerCluster
+
+import map_assets
+
+GEOJSON = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "id": "FRA",
+            "properties": {"name": "France", "fillColor": "#2c7bb6"},
+            "geometry": {"type": "Polygon", "coordinates": [[[2, 46], [3, 46], [3, 47], [2, 47], [2, 46]]]},
+        },
+        {
+            "type": "Feature",
+            "id": "NER",
+            "properties": {"name": "Niger", "fillColor": "#d7191c"},
+            "geometry": {"type": "Polygon", "coordinates": [[[8, 16], [9, 16], [9, 17], [8, 17], [8, 16]]]},
+        },
+    ],
+}
+
+CELLS = [[48.85, 2.35, 3, "Alpha, Bêta, Gamma"], [13.51, 2.11, 1, "Delta"]]
+
+
+def normalized(html):
+    """Page où chaque identifiant d'élément est remplacé par son rang d'apparition"""
+    ids = {}
+    return re.sub(r"(?<=_)[0-9a-f]{32}", lambda m: str(ids.setdefault(m.group(0), len(ids))), html)
+
+
+def render(m):
+    return normalized(m.get_root().render())
+
+
+def st_folium_payload(m, layer=None):
+    """Ce que ``st_folium(m, render=False, feature_group_to_add=layer)`` envoie au navigateur,
+    suivi de la remise en état faite par l'application (``detach_layer``)"""
+    m.render()
+    payload = [streamlit_folium._get_html(m), streamlit_folium._get_header(m), streamlit_folium._get_map_string(m)]
+    if layer is not None:
+        payload.append(streamlit_folium._get_feature_group_string(layer, m))
+        map_assets.detach_layer(m, layer)
+    return normalized("\n".join(payload))
+
+
+def idh_map(geojson_class, **options):
+    m = folium.Map(location=[20, 0], zoom_start=2, **options)
+    geojson_class(
+        GEOJSON,
+        style_function=map_assets.idh_style,
+        highlight_function=map_assets.idh_highlight,
+        tooltip=folium.GeoJsonTooltip(fields=["name"], aliases=["Pays :"]),
+    ).add_to(m)
+    return m
+
+
+def hq_layer(cluster_class):
+    layer = folium.FeatureGroup(name="Sièges des ONG")
+    cluster_class(CELLS, callback=map_assets.HQ_MARKER_CALLBACK, icon_create_function=map_assets.HQ_CLUSTER_ICON,
+                  options={"showCoverageOnHover": False}).add_to(layer)
+    return layer
+
+
+def test_first_render_matches_folium():
+    plain = idh_map(folium.GeoJson)
+    hq_layer(FastMarkerCluster).add_to(plain)
+    m = idh_map(map_assets.StaticGeoJson)
+    hq_layer(map_assets.StaticFastMarkerCluster).add_to(m)
+    assert render(m) == render(plain)
+
+
+def test_cached_page_matches_first_folium_render():
+    """Sans fond de carte (folium ajoute un ``addTo`` par rendu pour ses couches), la page est stable"""
+    expected = render(idh_map(folium.GeoJson, tiles=None))
+    m = idh_map(map_assets.StaticGeoJson, tiles=None)
+    assert [render(m) for _ in range(3)] == [expected] * 3
+
+
+def test_cached_renders_match_folium():
+    """Reruns successifs : carte partagée, couche des sièges ajoutée ou non, deux couches qui alternent"""
+    static_map, plain_map = idh_map(map_assets.StaticGeoJson), idh_map(folium.GeoJson)
+    for m in (static_map, plain_map):
+        m.get_root().render()  # comme ``build_idh_map``
+    static_layers = [hq_layer(map_assets.StaticFastMarkerCluster) for _ in range(2)]
+    plain_layers = [hq_layer(FastMarkerCluster) for _ in range(2)]
+    for i in (0, 0, 0, 1, 0, None, 1):
+        expected = st_folium_payload(plain_map, None if i is None else plain_layers[i])
+        assert st_folium_payload(static_map, None if i is None else static_layers[i]) == expected
+
+
+def test_renamed_element_is_rendered_again():
+    m = idh_map(map_assets.StaticGeoJson)
+    first = m.get_root().render()
+    layer = next(child for child in m._children.values() if isinstance(child, map_assets.StaticGeoJson))
+    old_name = layer.get_name()
+    layer._id = "0" * 32  # st_folium renomme les éléments avant le rendu
+    second = m.get_root().render()
+    assert layer.get_name() in second and layer.get_name() not in first
+    assert old_name in first
+
+
+def test_cache_does_not_keep_maps_alive():
+    """Une couche partagée entre cartes ne retient pas les cartes déjà rendues"""
+    layer = hq_layer(map_assets.StaticFastMarkerCluster)
+    old = folium.Map()
+    layer.add_to(old)
+    render(old)
+    figure = weakref.ref(old.get_root())
+
+    new = folium.Map()
+    map_assets.detach_layer(old, layer)
+    layer.add_to(new)
+    render(new)
+    del old
+    gc.collect()
+    assert figure() is None